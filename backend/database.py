@@ -1,12 +1,65 @@
 import sqlite3
-import json
+import msgpack
+import orjson
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Callable, List, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Columns stored as msgpack BLOBs (older databases hold JSON TEXT)
+PACKED_COLUMNS = {
+    'training_runs': 'config',
+    'models': 'metadata',
+    'datasets': 'fields',
+}
+
+# Fields update_training_run is allowed to set
+UPDATABLE_RUN_FIELDS = frozenset([
+    'status', 'completed_at', 'final_loss', 'total_steps', 'checkpoint_path', 'error_message'
+])
+
+# Queued writes are committed together once this many are pending or the
+# window has elapsed since the first of them was dequeued
+WRITE_BATCH_SIZE = 500
+WRITE_BATCH_WINDOW = 0.005
+
+# Hot-path SQL kept as constants so the text is identical on every call and
+# sqlite3's per-connection statement cache reuses the prepared statement
+INSERT_METRIC_SQL = """
+    INSERT INTO training_metrics (run_id, step, loss, learning_rate, epoch)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+@lru_cache(maxsize=64)
+def _update_run_sql(fields: Tuple[str, ...]) -> str:
+    """Build the UPDATE statement for one combination of training run fields"""
+    return f"UPDATE training_runs SET {', '.join(f'{key} = ?' for key in fields)} WHERE id = ?"
+
+def _pack(obj: Any) -> bytes:
+    """Serialize a structured column value"""
+    return msgpack.packb(obj, use_bin_type=True)
+
+def _unpack(value) -> Any:
+    """Deserialize a structured column value, accepting legacy JSON TEXT"""
+    if isinstance(value, bytes):
+        return msgpack.unpackb(value, raw=False)
+    return orjson.loads(value)
+
+def _log_write_error(future: Future):
+    """Log a failed queued write"""
+    error = future.exception()
+    if error is not None:
+        logger.error(f"Database write failed: {error}")
+
 class Database:
     """SQLite database for training history and model metadata"""
 
@@ -15,12 +68,143 @@ class Database:
             db_path = Path(__file__).parent.parent / "work" / "slothbuckler.db"
 
         self.db_path = db_path
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        if str(self.db_path) != ':memory:':
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One long-lived writer keeps SQLite's page cache warm between calls;
+        # WAL lets a pool of read-only connections run alongside it
+        self._lock = threading.Lock()
+        self._conn = self._connect()
         self._init_db()
 
+        self._readers = queue.Queue()
+        if str(self.db_path) != ':memory:':
+            for _ in range(os.cpu_count() or 1):
+                self._readers.put(self._connect(read_only=True))
+
+        # Writes are applied by a dedicated thread so callers never wait on a commit
+        self._write_queue = queue.Queue()
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection with the per-connection PRAGMAs applied"""
+        if read_only:
+            # as_uri() percent-encodes the path, so drive letters and ?, # or % survive
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True,
+                                   check_same_thread=False, isolation_level=None)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")
+        conn.execute("PRAGMA mmap_size=268435456")  # read pages straight from a 256 MiB mapping
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def close(self):
+        """Flush pending writes, then close the writer and all pooled reader connections"""
+        self._write_queue.put(None)
+        self._writer_thread.join()
+        with self._lock:
+            self._conn.close()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+
+    def _submit(self, operation: Callable[[sqlite3.Connection], Any]) -> Future:
+        """Queue a write for the writer thread; the Future resolves once it is committed.
+
+        Failures are logged here, so writes queued without waiting on the Future
+        (caches, metrics) still surface their errors.
+        """
+        future = Future()
+        future.add_done_callback(_log_write_error)
+        self._write_queue.put((operation, future))
+        return future
+
+    def _execute(self, sql: str, params) -> Future:
+        """Queue a single statement, resolving to its lastrowid"""
+        return self._submit(lambda conn: conn.execute(sql, params).lastrowid)
+
+    def _writer_loop(self):
+        """Apply queued writes, grouping those that arrive together into one transaction"""
+        stopping = False
+        while not stopping:
+            item = self._write_queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + WRITE_BATCH_WINDOW
+            while len(batch) < WRITE_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._write_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._apply_batch(batch)
+
+    def _apply_batch(self, batch: List[Tuple[Callable[[sqlite3.Connection], Any], Future]]):
+        """Run a batch of writes in one BEGIN IMMEDIATE transaction"""
+        results = []
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                for operation, future in batch:
+                    # A savepoint per write keeps one failure from discarding the rest
+                    self._conn.execute("SAVEPOINT write_op")
+                    try:
+                        results.append((future, operation(self._conn), None))
+                    except Exception as e:
+                        self._conn.execute("ROLLBACK TO write_op")
+                        results.append((future, None, e))
+                    self._conn.execute("RELEASE write_op")
+                self._conn.execute("COMMIT")
+            except Exception as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                for _, future in batch:
+                    future.set_exception(e)
+                return
+
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    @contextmanager
+    def _read(self):
+        """Check a read-only connection out of the pool"""
+        if str(self.db_path) == ':memory:':
+            # An in-memory database is private to its connection
+            with self._lock:
+                yield self._conn
+            return
+
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
     def _init_db(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
+            # WAL is persisted in the database file, so it only needs setting once
+            if str(self.db_path) != ':memory:':
+                conn.execute("PRAGMA journal_mode=WAL")
+
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS training_runs (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -32,7 +216,7 @@ class Database:
                     status TEXT NOT NULL,
                     started_at TEXT NOT NULL,
                     completed_at TEXT,
-                    config TEXT NOT NULL,
+                    config BLOB NOT NULL,
                     final_loss REAL,
                     total_steps INTEGER,
                     checkpoint_path TEXT,
@@ -63,7 +247,7 @@ class Database:
                     size_bytes INTEGER,
                     training_run_id INTEGER,
                     created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    metadata TEXT,
+                    metadata BLOB,
                     FOREIGN KEY (training_run_id) REFERENCES training_runs(id)
                 )
             """)
@@ -76,103 +260,131 @@ class Database:
                     size_bytes INTEGER,
                     row_count INTEGER,
                     source TEXT,
-                    fields TEXT,
+                    fields BLOB,
                     validated BOOLEAN DEFAULT 0,
                     validation_errors TEXT,
                     created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
                 )
             """)
 
-            conn.commit()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS dataset_row_cache (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    row_count INTEGER
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS model_size_cache (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size_bytes INTEGER NOT NULL
+                )
+            """)
+
+            # Indexes for the filter/sort columns used by the getters and listers
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_metrics_run_step ON training_metrics(run_id, step)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_started ON training_runs(started_at DESC)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_models_created ON models(created_at DESC)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_datasets_created ON datasets(created_at DESC)")
+
+    def migrate_json_to_msgpack(self) -> int:
+        """Rewrite legacy JSON TEXT values as msgpack BLOBs, returning the rows converted"""
+        return self._submit(self._migrate_json_to_msgpack).result()
+
+    @staticmethod
+    def _migrate_json_to_msgpack(conn: sqlite3.Connection) -> int:
+        converted = 0
+        for table, column in PACKED_COLUMNS.items():
+            rows = conn.execute(
+                f"SELECT id, {column} FROM {table} WHERE typeof({column}) = 'text'"
+            ).fetchall()
+            conn.executemany(
+                f"UPDATE {table} SET {column} = ? WHERE id = ?",
+                [(_pack(orjson.loads(row[column])), row['id']) for row in rows]
+            )
+            converted += len(rows)
+        return converted
 
     # Training Runs
     def create_training_run(self, model_name: str, base_model: str, dataset_name: str,
-                           dataset_path: str, output_path: str, config: Dict[str, Any]) -> int:
-        """Create a new training run record"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                INSERT INTO training_runs (
-                    model_name, base_model, dataset_name, dataset_path,
-                    output_path, status, started_at, config
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                model_name,
-                base_model,
-                dataset_name,
-                dataset_path,
-                output_path,
-                'running',
-                datetime.now().isoformat(),
-                json.dumps(config)
-            ))
-            conn.commit()
-            return cursor.lastrowid
-
-    def update_training_run(self, run_id: int, **kwargs):
+                           dataset_path: str, output_path: str, config: Dict[str, Any]) -> Future:
+        """Create a new training run record; the Future resolves to its ID"""
+        return self._execute("""
+            INSERT INTO training_runs (
+                model_name, base_model, dataset_name, dataset_path,
+                output_path, status, started_at, config
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            model_name,
+            base_model,
+            dataset_name,
+            dataset_path,
+            output_path,
+            'running',
+            datetime.now().isoformat(),
+            _pack(config)
+        ))
+
+    def update_training_run(self, run_id: int, **kwargs) -> Optional[Future]:
         """Update training run fields"""
-        fields = []
-        values = []
-
-        for key, value in kwargs.items():
-            if key in ['status', 'completed_at', 'final_loss', 'total_steps',
-                      'checkpoint_path', 'error_message']:
-                fields.append(f"{key} = ?")
-                values.append(value)
+        fields = tuple(key for key in kwargs if key in UPDATABLE_RUN_FIELDS)
 
         if fields:
+            values = [kwargs[key] for key in fields]
             values.append(run_id)
-            query = f"UPDATE training_runs SET {', '.join(fields)} WHERE id = ?"
-
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(query, values)
-                conn.commit()
+            return self._execute(_update_run_sql(fields), values)
+        return None
 
     def get_training_run(self, run_id: int) -> Optional[Dict]:
         """Get training run by ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._read() as conn:
             cursor = conn.execute("SELECT * FROM training_runs WHERE id = ?", (run_id,))
             row = cursor.fetchone()
 
             if row:
                 data = dict(row)
-                data['config'] = json.loads(data['config'])
+                data['config'] = _unpack(data['config'])
                 return data
             return None
 
     def list_training_runs(self, limit: int = 50) -> List[Dict]:
-        """List recent training runs"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
+        """Get recent training runs"""
+        return self.list_training_runs_page(0, limit)
+
+    def list_training_runs_page(self, offset: int = 0, limit: int = 50) -> List[Dict]:
+        """Get one page of training runs, newest first"""
+        # Rows are fetched before the connection goes back to the pool, never yielded
+        # from it, so a caller that stops early can't keep a reader checked out
+        with self._read() as conn:
+            rows = conn.execute("""
                 SELECT * FROM training_runs
                 ORDER BY started_at DESC
-                LIMIT ?
-            """, (limit,))
+                LIMIT ? OFFSET ?
+            """, (limit, offset)).fetchall()
 
-            runs = []
-            for row in cursor.fetchall():
-                data = dict(row)
-                data['config'] = json.loads(data['config'])
-                runs.append(data)
-
-            return runs
+        return [{**dict(row), 'config': _unpack(row['config'])} for row in rows]
 
     # Training Metrics
     def add_training_metric(self, run_id: int, step: int, loss: Optional[float] = None,
-                           learning_rate: Optional[float] = None, epoch: Optional[float] = None):
+                           learning_rate: Optional[float] = None, epoch: Optional[float] = None) -> Future:
         """Add a training metric data point"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO training_metrics (run_id, step, loss, learning_rate, epoch)
-                VALUES (?, ?, ?, ?, ?)
-            """, (run_id, step, loss, learning_rate, epoch))
-            conn.commit()
+        return self.add_training_metrics_batch(run_id, [(step, loss, learning_rate, epoch)])
+
+    def add_training_metrics_batch(self, run_id: int,
+                                   metrics: List[Tuple[int, Optional[float], Optional[float], Optional[float]]]) -> Optional[Future]:
+        """Add several (step, loss, learning_rate, epoch) data points in one transaction"""
+        if not metrics:
+            return None
+
+        rows = [(run_id, *metric) for metric in metrics]
+        return self._submit(lambda conn: conn.executemany(INSERT_METRIC_SQL, rows).rowcount)
 
     def get_training_metrics(self, run_id: int) -> List[Dict]:
         """Get all metrics for a training run"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._read() as conn:
             cursor = conn.execute("""
                 SELECT * FROM training_metrics
                 WHERE run_id = ?
@@ -183,104 +395,152 @@ class Database:
 
     # Models
     def add_model(self, name: str, path: str, base_model: str, size_bytes: int,
-                 training_run_id: Optional[int] = None, metadata: Optional[Dict] = None):
+                 training_run_id: Optional[int] = None, metadata: Optional[Dict] = None) -> Future:
         """Add a model to the database"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO models (name, path, base_model, size_bytes, training_run_id, metadata)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                name,
-                path,
-                base_model,
-                size_bytes,
-                training_run_id,
-                json.dumps(metadata) if metadata else None
-            ))
-            conn.commit()
+        return self._execute("""
+            INSERT INTO models (name, path, base_model, size_bytes, training_run_id, metadata)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            name,
+            path,
+            base_model,
+            size_bytes,
+            training_run_id,
+            _pack(metadata) if metadata else None
+        ))
 
     def get_model(self, name: str) -> Optional[Dict]:
         """Get model by name"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._read() as conn:
             cursor = conn.execute("SELECT * FROM models WHERE name = ?", (name,))
             row = cursor.fetchone()
 
             if row:
                 data = dict(row)
                 if data['metadata']:
-                    data['metadata'] = json.loads(data['metadata'])
+                    data['metadata'] = _unpack(data['metadata'])
                 return data
             return None
 
     def list_models(self) -> List[Dict]:
-        """List all models"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("SELECT * FROM models ORDER BY created_at DESC")
-
-            models = []
-            for row in cursor.fetchall():
-                data = dict(row)
-                if data['metadata']:
-                    data['metadata'] = json.loads(data['metadata'])
-                models.append(data)
-
-            return models
-
-    def delete_model(self, name: str):
+        """Get all models"""
+        with self._read() as conn:
+            rows = conn.execute("SELECT * FROM models ORDER BY created_at DESC").fetchall()
+
+        models = []
+        for row in rows:
+            data = dict(row)
+            if data['metadata']:
+                data['metadata'] = _unpack(data['metadata'])
+            models.append(data)
+        return models
+
+    def delete_model(self, name: str) -> Future:
         """Delete a model from database"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("DELETE FROM models WHERE name = ?", (name,))
-            conn.commit()
+        return self._execute("DELETE FROM models WHERE name = ?", (name,))
 
     # Datasets
     def add_dataset(self, name: str, path: str, size_bytes: int, row_count: Optional[int] = None,
                    source: str = 'local', fields: Optional[List[str]] = None,
-                   validated: bool = False, validation_errors: Optional[str] = None):
+                   validated: bool = False, validation_errors: Optional[str] = None) -> Future:
         """Add a dataset to the database"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO datasets
-                (name, path, size_bytes, row_count, source, fields, validated, validation_errors)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                name,
-                path,
-                size_bytes,
-                row_count,
-                source,
-                json.dumps(fields) if fields else None,
-                validated,
-                validation_errors
-            ))
-            conn.commit()
+        return self._execute("""
+            INSERT INTO datasets
+            (name, path, size_bytes, row_count, source, fields, validated, validation_errors)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                path = excluded.path,
+                size_bytes = excluded.size_bytes,
+                row_count = excluded.row_count,
+                source = excluded.source,
+                fields = excluded.fields,
+                validated = excluded.validated,
+                validation_errors = excluded.validation_errors
+        """, (
+            name,
+            path,
+            size_bytes,
+            row_count,
+            source,
+            _pack(fields) if fields else None,
+            validated,
+            validation_errors
+        ))
 
     def get_dataset(self, name: str) -> Optional[Dict]:
         """Get dataset by name"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._read() as conn:
             cursor = conn.execute("SELECT * FROM datasets WHERE name = ?", (name,))
             row = cursor.fetchone()
 
             if row:
                 data = dict(row)
                 if data['fields']:
-                    data['fields'] = json.loads(data['fields'])
+                    data['fields'] = _unpack(data['fields'])
                 return data
             return None
 
     def list_datasets(self) -> List[Dict]:
-        """List all datasets"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("SELECT * FROM datasets ORDER BY created_at DESC")
-
-            datasets = []
-            for row in cursor.fetchall():
-                data = dict(row)
-                if data['fields']:
-                    data['fields'] = json.loads(data['fields'])
-                datasets.append(data)
-
-            return datasets
+        """Get all datasets"""
+        with self._read() as conn:
+            rows = conn.execute("SELECT * FROM datasets ORDER BY created_at DESC").fetchall()
+
+        datasets = []
+        for row in rows:
+            data = dict(row)
+            if data['fields']:
+                data['fields'] = _unpack(data['fields'])
+            datasets.append(data)
+        return datasets
+
+    def get_dataset_row_counts(self) -> Dict[str, Tuple[int, int, Optional[int]]]:
+        """Get cached dataset row counts as {path: (mtime_ns, size_bytes, row_count)}"""
+        with self._read() as conn:
+            cursor = conn.execute("SELECT path, mtime_ns, size_bytes, row_count FROM dataset_row_cache")
+            return {row['path']: (row['mtime_ns'], row['size_bytes'], row['row_count']) for row in cursor}
+
+    def set_dataset_row_count(self, path: str, mtime_ns: int, size_bytes: int,
+                              row_count: Optional[int]) -> Future:
+        """Cache the row count of a dataset file at a given mtime and size"""
+        return self._execute("""
+            INSERT INTO dataset_row_cache (path, mtime_ns, size_bytes, row_count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                mtime_ns = excluded.mtime_ns,
+                size_bytes = excluded.size_bytes,
+                row_count = excluded.row_count
+        """, (path, mtime_ns, size_bytes, row_count))
+
+    def prune_dataset_row_counts(self, keep_paths: List[str]) -> Future:
+        """Drop cached row counts for dataset files no longer present"""
+        return self._prune_cache('dataset_row_cache', keep_paths)
+
+    def get_model_sizes(self) -> Dict[str, Tuple[int, int]]:
+        """Get cached model directory sizes as {path: (mtime_ns, size_bytes)}"""
+        with self._read() as conn:
+            cursor = conn.execute("SELECT path, mtime_ns, size_bytes FROM model_size_cache")
+            return {row['path']: (row['mtime_ns'], row['size_bytes']) for row in cursor}
+
+    def set_model_size(self, path: str, mtime_ns: int, size_bytes: int) -> Future:
+        """Cache the total size of a model directory at a given top-level mtime"""
+        return self._execute("""
+            INSERT INTO model_size_cache (path, mtime_ns, size_bytes)
+            VALUES (?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                mtime_ns = excluded.mtime_ns,
+                size_bytes = excluded.size_bytes
+        """, (path, mtime_ns, size_bytes))
+
+    def prune_model_sizes(self, keep_paths: List[str]) -> Future:
+        """Drop cached sizes for model directories no longer present"""
+        return self._prune_cache('model_size_cache', keep_paths)
+
+    def _prune_cache(self, table: str, keep_paths: List[str]) -> Future:
+        """Delete rows of a path-keyed cache table whose path is not in keep_paths"""
+        def prune(conn: sqlite3.Connection) -> int:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_paths (path TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM keep_paths")
+            conn.executemany("INSERT OR IGNORE INTO keep_paths VALUES (?)", ((p,) for p in keep_paths))
+            cursor = conn.execute(f"DELETE FROM {table} WHERE path NOT IN (SELECT path FROM keep_paths)")
+            return cursor.rowcount
+        return self._submit(prune)
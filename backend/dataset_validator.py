@@ -1,20 +1,59 @@
-import json
+import array
+import codecs
+import itertools
+import mmap
+import os
+import ijson
+import numpy as np
+import orjson
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 import logging
 
+try:
+    import simdjson  # Optional SIMD-accelerated parser
+except ImportError:
+    simdjson = None
+
 logger = logging.getLogger(__name__)
 
+
+class _CappedReader:
+    """Binary file wrapper that reports EOF once `limit` bytes have been read"""
+
+    def __init__(self, f, limit: int):
+        self._f = f
+        self.remaining = limit
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self._f.read(size)
+        self.remaining -= len(data)
+        return data
+
+
 class DatasetValidator:
     """Validates datasets for training"""
 
     COMMON_TEXT_FIELDS = ['text', 'prompt', 'instruction', 'input', 'question', 'content', 'message']
+    _TEXT_FIELD_SET = frozenset(COMMON_TEXT_FIELDS)
+
+    # Rows decoded for JSONL text stats; larger files are sampled
+    STATS_SAMPLE_ROWS = 10000
+
+    # Bytes read before row counts are extrapolated instead of exact
+    MAX_SCAN_BYTES = 64 * 1024 * 1024
 
     @staticmethod
-    def validate_dataset(file_path: Path) -> Dict:
+    def validate_dataset(file_path: Path, max_scan_bytes: Optional[int] = MAX_SCAN_BYTES) -> Dict:
         """
         Validate a dataset file
 
+        Files larger than max_scan_bytes (None to scan everything) are only
+        read up to that budget; their row count is extrapolated and their
+        stats are marked as sampled.
+
         Returns:
             {
                 "valid": bool,
@@ -26,7 +65,8 @@ class DatasetValidator:
                     "detected_text_field": str,
                     "avg_text_length": float,
                     "min_text_length": int,
-                    "max_text_length": int
+                    "max_text_length": int,
+                    "sampled": bool  # Stats/row count estimated from part of the file
                 },
                 "preview": List[Dict]  # First 5 rows
             }
@@ -52,11 +92,11 @@ class DatasetValidator:
 
             # Parse file based on extension
             if file_path.suffix == '.jsonl':
-                return DatasetValidator._validate_jsonl(file_path, result)
+                return DatasetValidator._validate_jsonl(file_path, result, max_scan_bytes)
             elif file_path.suffix == '.json':
-                return DatasetValidator._validate_json(file_path, result)
+                return DatasetValidator._validate_json(file_path, result, max_scan_bytes)
             elif file_path.suffix == '.csv':
-                return DatasetValidator._validate_csv(file_path, result)
+                return DatasetValidator._validate_csv(file_path, result, max_scan_bytes)
             else:
                 result["errors"].append(f"Unsupported file format: {file_path.suffix}")
                 return result
@@ -67,49 +107,132 @@ class DatasetValidator:
             return result
 
     @staticmethod
-    def _validate_jsonl(file_path: Path, result: Dict) -> Dict:
+    def _make_parser() -> Callable[[Any], Any]:
+        """Return a JSON decoder, reusing a single simdjson parser when available"""
+        if simdjson is None:
+            return orjson.loads
+
+        parser = simdjson.Parser()
+        return lambda data: parser.parse(data, True)
+
+    @staticmethod
+    def _count_newlines(mm: mmap.mmap, limit: int, chunk_size: int = 16 * 1024 * 1024) -> int:
+        """Count newline bytes in the first `limit` bytes, in fixed-size chunks"""
+        return sum(mm[i:min(i + chunk_size, limit)].count(b'\n') for i in range(0, limit, chunk_size))
+
+    @staticmethod
+    def _next_line_start(mm: mmap.mmap, offset: int) -> int:
+        """Return the first line start at or after `offset`"""
+        if offset == 0:
+            return 0
+        newline = mm.find(b'\n', offset - 1)
+        return len(mm) if newline == -1 else newline + 1
+
+    @staticmethod
+    def _iter_stat_lines(mm: mmap.mmap, start: int, end: int,
+                         sample_rows: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the lines starting in [start, end), or `sample_rows` of them at evenly spaced offsets"""
+        size = len(mm)
+        if sample_rows is None:
+            while start < end:
+                line_end = mm.find(b'\n', start)
+                if line_end == -1:
+                    line_end = size
+                yield mm[start:line_end]
+                start = line_end + 1
+            return
+
+        last = -1
+        step = (end - start) / sample_rows
+        for k in range(sample_rows):
+            # Align each offset forward to the start of the next full line
+            offset = DatasetValidator._next_line_start(mm, start + int(k * step)) if k else start
+            if offset >= end:
+                break
+            if offset <= last:
+                continue
+
+            line_end = mm.find(b'\n', offset)
+            if line_end == -1:
+                line_end = size
+            yield mm[offset:line_end]
+            last = offset
+
+    @staticmethod
+    def _validate_jsonl(file_path: Path, result: Dict, max_scan_bytes: Optional[int] = None) -> Dict:
         """Validate JSONL format"""
         rows = []
-        text_lengths = []
+        text_lengths = array.array('i')
         fields_set = set()
+        text_field = None  # Resolved from the first row that has one
+        parse = DatasetValidator._make_parser()
+        sampled = False
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for i, line in enumerate(f):
-                    if i >= 5:  # Preview first 5 rows
-                        # Keep counting for stats
-                        try:
-                            row = json.loads(line.strip())
-                            fields_set.update(row.keys())
-
-                            # Find text field
-                            text_field = DatasetValidator._detect_text_field(row)
-                            if text_field and isinstance(row[text_field], str):
-                                text_lengths.append(len(row[text_field]))
-                        except:
-                            pass
-                        continue
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    result["errors"].append("Dataset is empty")
+                    return result
 
-                    # Parse row
-                    try:
-                        row = json.loads(line.strip())
-                    except json.JSONDecodeError as e:
-                        result["errors"].append(f"Invalid JSON on line {i+1}: {str(e)}")
-                        continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # Count rows from newlines without decoding anything; past the
+                    # scan budget the count is extrapolated from the scanned prefix
+                    size = len(mm)
+                    scan_bytes = size if max_scan_bytes is None else min(size, max_scan_bytes)
+                    row_count = DatasetValidator._count_newlines(mm, scan_bytes)
+                    estimated = scan_bytes < size
+                    if estimated:
+                        row_count = max(1, round(row_count * size / scan_bytes))
+                    elif mm[-1:] != b'\n':
+                        row_count += 1
+
+                    # Preview first 5 rows, reporting any that are malformed.
+                    # Lines are decoded as-is; only a leading BOM is skipped, once.
+                    pos = len(codecs.BOM_UTF8) if mm[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+                    for i in range(min(5, row_count)):
+                        end = mm.find(b'\n', pos)
+                        if end == -1:
+                            end = len(mm)
+                        line = mm[pos:end]
+                        pos = end + 1
+
+                        # Parse row
+                        try:
+                            row = parse(line)
+                        except ValueError as e:
+                            result["errors"].append(f"Invalid JSON on line {i+1}: {str(e)}")
+                            continue
 
-                    if not isinstance(row, dict):
-                        result["errors"].append(f"Line {i+1} is not a JSON object")
-                        continue
+                        if not isinstance(row, dict):
+                            result["errors"].append(f"Line {i+1} is not a JSON object")
+                            continue
 
-                    fields_set.update(row.keys())
-                    rows.append(row)
+                        fields_set.update(row.keys())
+                        rows.append(row)
 
-                    # Check for text field
-                    text_field = DatasetValidator._detect_text_field(row)
-                    if text_field and isinstance(row[text_field], str):
-                        text_lengths.append(len(row[text_field]))
+                        # Check for text field
+                        if text_field is None:
+                            text_field = DatasetValidator._detect_text_field(row)
+                        text = row.get(text_field)
+                        if isinstance(text, str):
+                            text_lengths.append(len(text))
+
+                    # Collect stats from the remaining rows, sampled for large files
+                    sampled = estimated or row_count - min(5, row_count) > DatasetValidator.STATS_SAMPLE_ROWS
+                    sample_rows = DatasetValidator.STATS_SAMPLE_ROWS if sampled else None
+                    for line in DatasetValidator._iter_stat_lines(mm, pos, size, sample_rows):
+                        try:
+                            row = parse(line)
+                            fields_set.update(row.keys())
 
-            row_count = i + 1 if 'i' in locals() else 0
+                            # Find text field
+                            if text_field is None:
+                                text_field = DatasetValidator._detect_text_field(row)
+                            text = row.get(text_field)
+                            if isinstance(text, str):
+                                text_lengths.append(len(text))
+                        except Exception:
+                            pass
 
             # Validation checks
             if row_count == 0:
@@ -130,9 +253,7 @@ class DatasetValidator:
 
             # Check text lengths
             if text_lengths:
-                avg_length = sum(text_lengths) / len(text_lengths)
-                min_length = min(text_lengths)
-                max_length = max(text_lengths)
+                avg_length, min_length, max_length = DatasetValidator._length_stats(text_lengths)
 
                 if avg_length < 10:
                     result["warnings"].append(f"Very short texts (avg {avg_length:.0f} chars) - may not train well")
@@ -146,7 +267,8 @@ class DatasetValidator:
                     "detected_text_field": detected_field,
                     "avg_text_length": round(avg_length, 1),
                     "min_text_length": min_length,
-                    "max_text_length": max_length
+                    "max_text_length": max_length,
+                    "sampled": sampled
                 }
 
             result["preview"] = rows
@@ -159,37 +281,60 @@ class DatasetValidator:
             return result
 
     @staticmethod
-    def _validate_json(file_path: Path, result: Dict) -> Dict:
-        """Validate JSON format"""
+    def _validate_json(file_path: Path, result: Dict, max_scan_bytes: Optional[int] = None) -> Dict:
+        """Validate JSON format, streaming array items instead of loading the whole file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(file_path, 'rb') as f:
+                # Past the scan budget the parser sees EOF, so the items it returns are
+                # exactly those within the budget (a file position would run ahead of
+                # them by the parser's read-ahead)
+                size = os.fstat(f.fileno()).st_size
+                capped = max_scan_bytes is not None and size > max_scan_bytes
+                source = _CappedReader(f, max_scan_bytes) if capped else f
+                events = ijson.parse(source, use_float=True)
+
+                # Should be a list of objects
+                first_event = next(events, None)
+                if first_event is None or first_event[1] != 'start_array':
+                    result["errors"].append("JSON file must contain an array of objects")
+                    return result
 
-            # Should be a list of objects
-            if not isinstance(data, list):
-                result["errors"].append("JSON file must contain an array of objects")
-                return result
+                fields_set = set()
+                text_lengths = array.array('i')
+                preview = []
+                row_count = 0
+                text_field = None  # Resolved from the first item that has one
+                sampled = False
+
+                try:
+                    for i, item in enumerate(ijson.items(itertools.chain([first_event], events), 'item')):
+                        row_count += 1
+                        if len(preview) < 5:
+                            preview.append(item)
+
+                        if not isinstance(item, dict):
+                            result["errors"].append(f"Item {i} is not a JSON object")
+                            continue
+
+                        fields_set.update(item.keys())
+
+                        # Find text field
+                        if text_field is None:
+                            text_field = DatasetValidator._detect_text_field(item)
+                        text = item.get(text_field)
+                        if isinstance(text, str):
+                            text_lengths.append(len(text))
+                except ijson.IncompleteJSONError:
+                    if not capped or source.remaining:
+                        raise
+                    # The budget ran out mid-array; extrapolate the total from it
+                    sampled = True
+                    row_count = max(1, round(row_count * size / max_scan_bytes))
 
-            if len(data) == 0:
+            if row_count == 0:
                 result["errors"].append("Dataset is empty")
                 return result
 
-            # Validate first few items
-            fields_set = set()
-            text_lengths = []
-
-            for i, item in enumerate(data):
-                if not isinstance(item, dict):
-                    result["errors"].append(f"Item {i} is not a JSON object")
-                    continue
-
-                fields_set.update(item.keys())
-
-                # Find text field
-                text_field = DatasetValidator._detect_text_field(item)
-                if text_field and isinstance(item[text_field], str):
-                    text_lengths.append(len(item[text_field]))
-
             fields = list(fields_set)
             detected_field = DatasetValidator._detect_text_field_from_list(fields)
 
@@ -200,21 +345,23 @@ class DatasetValidator:
 
             # Stats
             if text_lengths:
+                avg_length, min_length, max_length = DatasetValidator._length_stats(text_lengths)
                 result["stats"] = {
-                    "row_count": len(data),
+                    "row_count": row_count,
                     "fields": fields,
                     "detected_text_field": detected_field,
-                    "avg_text_length": round(sum(text_lengths) / len(text_lengths), 1),
-                    "min_text_length": min(text_lengths),
-                    "max_text_length": max(text_lengths)
+                    "avg_text_length": round(avg_length, 1),
+                    "min_text_length": min_length,
+                    "max_text_length": max_length,
+                    "sampled": sampled
                 }
 
-            result["preview"] = data[:5]
+            result["preview"] = preview
             result["valid"] = len(result["errors"]) == 0
 
             return result
 
-        except json.JSONDecodeError as e:
+        except ijson.JSONError as e:
             result["errors"].append(f"Invalid JSON: {str(e)}")
             return result
         except Exception as e:
@@ -222,38 +369,56 @@ class DatasetValidator:
             return result
 
     @staticmethod
-    def _validate_csv(file_path: Path, result: Dict) -> Dict:
+    def _validate_csv(file_path: Path, result: Dict, max_scan_bytes: Optional[int] = None) -> Dict:
         """Validate CSV format"""
         import csv
 
         try:
             rows = []
-            text_lengths = []
+            text_lengths = array.array('i')
+
+            with open(file_path, 'r', encoding='utf-8', newline='') as f:
+                # Bytes of the lines handed to the CSV reader so far; the binary file
+                # position would run ahead of them by the text layer's read-ahead
+                consumed = 0
+
+                def lines():
+                    nonlocal consumed
+                    for line in f:
+                        if max_scan_bytes is not None:
+                            consumed += len(line.encode('utf-8'))
+                        yield line
 
-            with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                fields = reader.fieldnames
+                reader = csv.reader(lines())
+                fields = next(reader, None)
 
                 if not fields:
                     result["errors"].append("CSV has no header row")
                     return result
 
-                for i, row in enumerate(reader):
-                    if i >= 5:
-                        # Continue counting
-                        text_field = DatasetValidator._detect_text_field(row)
-                        if text_field and isinstance(row[text_field], str):
-                            text_lengths.append(len(row[text_field]))
+                # The header fixes the text column for every row
+                detected_field = DatasetValidator._detect_text_field_from_list(fields)
+                text_idx = fields.index(detected_field) if detected_field else None
+
+                row_count = 0
+                sampled = False
+                for row in reader:
+                    if not row:  # Blank lines are not rows
                         continue
+                    row_count += 1
 
-                    rows.append(row)
-                    text_field = DatasetValidator._detect_text_field(row)
-                    if text_field and isinstance(row[text_field], str):
-                        text_lengths.append(len(row[text_field]))
+                    # Only preview rows are materialized as dicts
+                    if row_count <= 5:
+                        rows.append(dict(zip(fields, row)))
 
-                row_count = i + 1 if 'i' in locals() else 0
+                    if text_idx is not None and text_idx < len(row):
+                        text_lengths.append(len(row[text_idx]))
 
-            detected_field = DatasetValidator._detect_text_field_from_list(fields)
+                    # Stop at the scan budget and extrapolate the total
+                    if max_scan_bytes is not None and consumed > max_scan_bytes:
+                        sampled = True
+                        row_count = round(row_count * os.fstat(f.fileno()).st_size / consumed)
+                        break
 
             if not detected_field:
                 result["errors"].append(f"No text field found. Expected one of: {', '.join(DatasetValidator.COMMON_TEXT_FIELDS)}")
@@ -261,13 +426,15 @@ class DatasetValidator:
                 return result
 
             if text_lengths:
+                avg_length, min_length, max_length = DatasetValidator._length_stats(text_lengths)
                 result["stats"] = {
                     "row_count": row_count,
                     "fields": list(fields),
                     "detected_text_field": detected_field,
-                    "avg_text_length": round(sum(text_lengths) / len(text_lengths), 1),
-                    "min_text_length": min(text_lengths),
-                    "max_text_length": max(text_lengths)
+                    "avg_text_length": round(avg_length, 1),
+                    "min_text_length": min_length,
+                    "max_text_length": max_length,
+                    "sampled": sampled
                 }
 
             result["preview"] = rows
@@ -279,13 +446,18 @@ class DatasetValidator:
             result["errors"].append(f"Error reading CSV file: {str(e)}")
             return result
 
+    @staticmethod
+    def _length_stats(text_lengths: array.array) -> Tuple[float, int, int]:
+        """Return (avg, min, max) of the collected text lengths in one NumPy pass"""
+        lengths = np.frombuffer(text_lengths, dtype=np.intc)
+        return float(lengths.mean()), int(lengths.min()), int(lengths.max())
+
     @staticmethod
     def _detect_text_field(row: Dict) -> Optional[str]:
         """Detect which field contains the training text"""
-        for field in DatasetValidator.COMMON_TEXT_FIELDS:
-            if field in row:
-                return field
-        return None
+        if DatasetValidator._TEXT_FIELD_SET.isdisjoint(row):
+            return None
+        return next((field for field in DatasetValidator.COMMON_TEXT_FIELDS if field in row), None)
 
     @staticmethod
     def _detect_text_field_from_list(fields: List[str]) -> Optional[str]:
@@ -294,3 +466,4 @@ class DatasetValidator:
             if field in fields:
                 return field
         return None
+
@@ -1,10 +1,118 @@
+from array import array
+from datetime import datetime, timezone
+from io import BytesIO
 import docker
 from docker.errors import DockerException, NotFound, APIError
+from docker.utils.socket import consume_socket_output, demux_adaptor, frames_iter
+import json
 import logging
+import orjson
+import os
+import re
+import tarfile
 import threading
+import time
+from runtime import docker_client
 
 logger = logging.getLogger(__name__)
 
+# Layer status codes for pull progress tracking
+LAYER_UNKNOWN = 0
+LAYER_DOWNLOADING = 1
+LAYER_PULL_COMPLETE = 2
+LAYER_ALREADY_EXISTS = 3
+
+LAYER_STATUS_CODES = {
+    "Downloading": LAYER_DOWNLOADING,
+    "Pull complete": LAYER_PULL_COMPLETE,
+    "Already exists": LAYER_ALREADY_EXISTS,
+}
+LAYER_STATUS_NAMES = {code: name for name, code in LAYER_STATUS_CODES.items()}
+
+# Downloading events for a layer are dropped unless this much time has passed
+# or the layer advanced by at least this fraction of its size
+PULL_PROGRESS_MIN_INTERVAL = 0.25  # seconds
+PULL_PROGRESS_MIN_DELTA = 0.01
+
+# Popular Unsloth models offered when the container can't be queried
+DEFAULT_MODELS = (
+    "unsloth/llama-3.1-8b-bnb-4bit",
+    "unsloth/mistral-7b-v0.3-bnb-4bit",
+    "unsloth/Qwen2.5-7B-bnb-4bit",
+    "unsloth/gemma-2-9b-bnb-4bit",
+    "unsloth/Phi-3.5-mini-instruct",
+    "unsloth/llama-3.2-1b-instruct-bnb-4bit",
+    "unsloth/llama-3.2-3b-instruct-bnb-4bit",
+)
+
+# Pull stream lines without these keys carry nothing we track
+_PULL_LINE_KEYS = (b'"id"', b'"error"')
+
+# Unsloth's model registry inside the container image
+MAPPER_PATH = "/opt/conda/lib/python3.11/site-packages/unsloth/models/mapper.py"
+
+# Model names as they appear in Unsloth's source code
+_MAPPER_RE = re.compile(rb'"(unsloth/[^"]+)"')
+
+# Warm inference server kept resident inside the container (see inference_server.py)
+INFERENCE_SERVER_SOURCE = open(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "inference_server.py"),
+    encoding="utf-8"
+).read()
+INFERENCE_SOCKET = "/tmp/unsloth_inference.sock"
+INFERENCE_SERVER_START_TIMEOUT = 30  # seconds to wait for the socket after starting the server
+INFERENCE_SERVER_DOWN = 3  # client exit code when nothing is listening on the socket
+
+# Tiny client exec'd per request; it only forwards JSON, so it starts in milliseconds
+INFERENCE_CLIENT_SCRIPT = '''
+import os
+import socket
+import sys
+import time
+
+deadline = time.monotonic() + float(os.environ["CONNECT_TIMEOUT"])
+while True:
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(os.environ["INFERENCE_SOCKET"])
+        break
+    except OSError:
+        client.close()
+        if time.monotonic() >= deadline:
+            sys.exit(3)
+        time.sleep(0.2)
+
+# The request follows this script on stdin as a single JSON line
+client.sendall(sys.stdin.buffer.readline())
+reply = b"".join(iter(lambda: client.recv(65536), b""))
+sys.stdout.write(reply.decode("utf-8"))
+'''
+
+# Asks a running inference server to free its models and exit, e.g. before training
+# needs the GPU. Takes the socket path as argv[1]; exits 3 when no server is running
+INFERENCE_SHUTDOWN_SCRIPT = '''
+import socket
+import sys
+
+client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+try:
+    client.connect(sys.argv[1])
+except OSError:
+    sys.exit(3)
+client.sendall(b'{"command": "shutdown"}\\n')
+client.recv(65536)
+'''
+
+# Run with `python -c` to execute a script sent over exec stdin. The script arrives
+# length-prefixed rather than ended by EOF, since not every transport can half-close
+# the exec socket (Docker Desktop's named pipe just closes); anything sent after it
+# stays on stdin for the script to read
+_STDIN_LOADER = (
+    "import sys\n"
+    "source = sys.stdin.buffer.read(int(sys.stdin.buffer.readline()))\n"
+    "exec(compile(source, '<stdin>', 'exec'), {'__name__': '__main__'})\n"
+)
+
 class DockerManager:
     """Manages Unsloth Docker container lifecycle"""
 
@@ -13,23 +121,110 @@ class DockerManager:
         self.image_name = "unsloth/unsloth"
         self.client = None
         self.container = None
-        self.pull_progress = {}
+        self._progress_lock = threading.Lock()  # guards the per-layer arrays only, never I/O
+        self._reset_pull_progress()
         self.pull_status = "idle"  # idle, pulling, complete, error
         self.start_thread = None
         self.start_error = None
+        self._start_done = threading.Event()  # cleared while a start is in progress
+        self._start_done.set()
         self._client_initialized = False
+        self._status_cache = None
+        self._status_cache_ts = 0.0
+        self._status_ttl = 5.0  # seconds
+        self._status_lock = threading.Lock()
+        self._container_list_cache = None  # (monotonic timestamp, raw container dicts)
+        self._container_list_ttl = 0.5  # seconds
+        self._running_container_cache = None  # (monotonic timestamp, raw container dict or None)
+        self._running_container_ttl = 2.0  # seconds
+        self._models_cache = None  # image ID -> model names, loaded lazily from disk
+        self._models_result = None
+        self._models_result_ts = 0.0
+        self._models_ttl = 60.0  # seconds
+        self._gpu_available = None  # cached result of _has_gpu()
+        self._image_id_cache = None  # ID of the Unsloth image once seen locally
+        self._inference_server_lock = threading.Lock()
+        self._inference_server_started = {}  # container ID -> monotonic time of last start
 
     def _get_client(self):
         """Lazy initialize Docker client"""
         if not self._client_initialized:
             try:
-                self.client = docker.from_env()
+                self.client = docker_client()
                 self._client_initialized = True
+                self._remove_leftover_probes()
             except DockerException as e:
                 logger.error(f"Docker not available: {e}")
                 self._client_initialized = True  # Mark as initialized to avoid retrying
         return self.client
 
+    def _remove_leftover_probes(self):
+        """Force-remove GPU probe containers left behind by a process that exited mid-start.
+
+        The in-process reaper never runs if the backend crashes or restarts, and
+        leftover probes would otherwise show up in the Unsloth container listings.
+        """
+        api = self.client.api
+        try:
+            probes = api.containers(all=True, filters={"name": f"{self.container_name}-gpuprobe-"})
+            for probe in probes:
+                api.remove_container(probe["Id"], force=True)
+                logger.info(f"Removed leftover GPU probe container {probe['Names'][0].lstrip('/')}")
+        except Exception as e:
+            logger.warning(f"Failed to remove leftover GPU probe containers: {e}")
+
+    def _image_present(self, revalidate: bool = False):
+        """Check whether the Unsloth image exists locally.
+
+        The image ID is cached once seen and only re-checked with revalidate=True,
+        using an ID-only image listing rather than a full inspect.
+        """
+        if self._image_id_cache and not revalidate:
+            return True
+        ids = self._get_client().api.images(name=self.image_name, quiet=True)
+        self._image_id_cache = ids[0] if ids else None
+        return bool(ids)
+
+    def _list_unsloth_containers(self, all: bool = False):
+        """List Unsloth containers (running only unless all=True) as raw Engine API dicts.
+
+        Unlike containers.list(), this does not inspect each container by ID, so a
+        container removed mid-listing cannot raise NotFound.
+        """
+        return self._get_client().api.containers(
+            all=all,
+            filters={"ancestor": self.image_name}
+        )
+
+    def _containers_snapshot(self):
+        """All Unsloth containers, shared by callers within a short TTL"""
+        with self._status_lock:
+            cached = self._container_list_cache
+        if cached is not None and time.monotonic() - cached[0] < self._container_list_ttl:
+            return cached[1]
+
+        containers = self._list_unsloth_containers(all=True)
+        with self._status_lock:
+            self._container_list_cache = (time.monotonic(), containers)
+        return containers
+
+    def get_running_container(self):
+        """The running Unsloth container as a raw Engine API dict, or None.
+
+        Export, inference and health checks all need it, so the answer is shared
+        for a couple of seconds and dropped whenever the container is started or stopped.
+        """
+        with self._status_lock:
+            cached = self._running_container_cache
+        if cached is not None and time.monotonic() - cached[0] < self._running_container_ttl:
+            return cached[1]
+
+        running = self._list_unsloth_containers()
+        container = running[0] if running else None
+        with self._status_lock:
+            self._running_container_cache = (time.monotonic(), container)
+        return container
+
     def list_containers(self):
         """List all Unsloth containers (running and stopped)"""
         client = self._get_client()
@@ -37,28 +232,46 @@ class DockerManager:
             return {"containers": []}
 
         try:
-            all_containers = client.containers.list(
-                all=True,
-                filters={"ancestor": self.image_name}
-            )
+            raw = self._containers_snapshot()
 
-            containers = []
-            for container in all_containers:
-                containers.append({
-                    "id": container.short_id,
-                    "name": container.name,
-                    "status": container.status,
-                    "created": container.attrs['Created'],
-                    "image": self.image_name
-                })
+            containers = [{
+                "id": c["Id"][:12],
+                "name": c["Names"][0].lstrip("/"),
+                "status": c["State"],
+                "created": datetime.fromtimestamp(c["Created"], timezone.utc).isoformat(),
+                "image": self.image_name
+            } for c in raw]
 
             return {"containers": containers}
         except Exception as e:
             logger.error(f"Error listing containers: {e}")
             return {"containers": []}
 
+    def _invalidate_status(self):
+        """Force the next status, models and container lookups to query the daemon"""
+        with self._status_lock:
+            self._status_cache_ts = 0.0
+            self._container_list_cache = None
+            self._running_container_cache = None
+            self._models_result_ts = 0.0
+
     def get_status(self):
         """Check Docker installation and detect any running Unsloth container"""
+        with self._status_lock:
+            if self._status_cache is not None and time.monotonic() - self._status_cache_ts < self._status_ttl:
+                return dict(self._status_cache)
+
+        status = self._fetch_status()
+
+        # Only successful daemon queries are cached
+        if status.get("docker_installed"):
+            with self._status_lock:
+                self._status_cache = status
+                self._status_cache_ts = time.monotonic()
+        return dict(status)
+
+    def _fetch_status(self):
+        """Query the Docker daemon for installation and container status"""
         client = self._get_client()
         if not client:
             return {
@@ -71,47 +284,36 @@ class DockerManager:
             }
 
         try:
-            # Check if Unsloth image exists
-            image_exists = False
-            try:
-                client.images.get(self.image_name)
-                image_exists = True
-            except NotFound:
-                pass
+            # One listing covers both running and stopped containers using the unsloth/unsloth image
+            all_containers = self._containers_snapshot()
+            running = next((c for c in all_containers if c["State"] == "running"), None)
+            stopped = next((c for c in all_containers if c["State"] == "exited"), None)
 
-            # Search for ANY running container using the unsloth/unsloth image
-            running_containers = client.containers.list(
-                filters={"ancestor": self.image_name, "status": "running"}
-            )
-
-            if running_containers:
-                container = running_containers[0]
+            if running:
+                name = running["Names"][0].lstrip("/")
                 return {
                     "docker_installed": True,
                     "image_pulled": True,
                     "container_running": True,
-                    "container_id": container.short_id,
-                    "container_name": container.name,
-                    "message": f"Connected to container: {container.name}"
+                    "container_id": running["Id"][:12],
+                    "container_name": name,
+                    "message": f"Connected to container: {name}"
                 }
 
-            # Check for stopped containers
-            stopped_containers = client.containers.list(
-                all=True,
-                filters={"ancestor": self.image_name, "status": "exited"}
-            )
-
-            if stopped_containers:
-                container = stopped_containers[0]
+            if stopped:
+                name = stopped["Names"][0].lstrip("/")
                 return {
                     "docker_installed": True,
                     "image_pulled": True,
                     "container_running": False,
-                    "container_id": container.short_id,
-                    "container_name": container.name,
-                    "message": f"Container exists but not running: {container.name}"
+                    "container_id": stopped["Id"][:12],
+                    "container_name": name,
+                    "message": f"Container exists but not running: {name}"
                 }
 
+            # Any container implies the image exists; otherwise ask for it directly
+            image_exists = bool(all_containers) or self._image_present()
+
             # Image exists but no containers
             if image_exists:
                 return {
@@ -152,7 +354,7 @@ class DockerManager:
             raise Exception("Docker is not available")
 
         # Check if already starting
-        if self.start_thread and self.start_thread.is_alive():
+        if not self._start_done.is_set():
             logger.info("Container start already in progress")
             return {
                 "success": True,
@@ -161,8 +363,10 @@ class DockerManager:
 
         # Start container in background thread
         logger.info("Starting container in background thread")
+        self._invalidate_status()
         self.pull_status = "idle"
         self.start_error = None
+        self._start_done.clear()
         self.start_thread = threading.Thread(target=self._start_container_worker, daemon=True)
         self.start_thread.start()
 
@@ -175,123 +379,139 @@ class DockerManager:
         """Background worker to start/create container"""
         logger.info("=== CONTAINER START WORKER RUNNING ===")
         try:
-            # Check if container already exists
-            try:
-                logger.info(f"Looking for container: {self.container_name}")
-                container = self.client.containers.get(self.container_name)
-                logger.info(f"Container found with status: {container.status}")
+            # Look up the container and the image up front with one listing each,
+            # instead of probing with get() calls that 404 on first start
+            logger.info(f"Looking for container: {self.container_name}")
+            existing = [
+                c for c in self.client.api.containers(all=True, filters={"name": self.container_name})
+                if f"/{self.container_name}" in c["Names"]
+            ]
+
+            if existing:
+                container = existing[0]
+                logger.info(f"Container found with status: {container['State']}")
 
-                if container.status == "running":
+                if container["State"] == "running":
                     logger.info("Container already running, returning success")
+                    self._invalidate_status()
                     return {
                         "success": True,
                         "message": "Container already running",
-                        "container_id": container.short_id
+                        "container_id": container["Id"][:12]
                     }
                 else:
                     # Start existing container
                     logger.info("Starting existing container")
-                    container.start()
+                    self.client.api.start(container["Id"])
+                    self._invalidate_status()
                     return {
                         "success": True,
                         "message": "Container started",
-                        "container_id": container.short_id
+                        "container_id": container["Id"][:12]
                     }
-            except NotFound:
-                logger.info("Container not found, will create new one")
-                # Create new container
-                logger.info(f"Creating new container from image {self.image_name}")
 
-                # Pull image if not exists
+            logger.info("Container not found, will create new one")
+            # Create new container
+            logger.info(f"Creating new container from image {self.image_name}")
+
+            # Pull image if not exists
+            if self._image_present(revalidate=True):
+                logger.info(f"Image {self.image_name} already exists")
+            else:
+                logger.info(f"Pulling image {self.image_name} (this may take 10-15 minutes for first time)...")
+                self.pull_status = "pulling"
+                self._image_id_cache = None
+                self._reset_pull_progress()
+
+                # Pull in streaming mode to avoid timeout, on a dedicated client so the
+                # long-lived stream doesn't hold a connection from the shared pool
+                pull_client = docker.from_env()
                 try:
-                    self.client.images.get(self.image_name)
-                    logger.info(f"Image {self.image_name} already exists")
-                except NotFound:
-                    logger.info(f"Pulling image {self.image_name} (this may take 10-15 minutes for first time)...")
-                    self.pull_status = "pulling"
-                    self.pull_progress = {}
-
-                    # Pull in streaming mode to avoid timeout
-                    for line in self.client.api.pull(self.image_name, stream=True, decode=True):
+                    for raw in self._iter_stream_lines(
+                            pull_client.api.pull(self.image_name, stream=True, decode=False)):
+                        # Cheap byte check before paying for a JSON decode
+                        if not any(key in raw for key in _PULL_LINE_KEYS):
+                            continue
+                        line = orjson.loads(raw)
+
                         if 'error' in line:
                             self.pull_status = "error"
                             raise Exception(f"Pull failed: {line['error']}")
 
                         # Track progress for each layer
                         if 'id' in line and 'status' in line:
-                            layer_id = line['id']
-                            self.pull_progress[layer_id] = {
-                                'status': line.get('status', ''),
-                                'progress': line.get('progress', ''),
-                                'current': line.get('progressDetail', {}).get('current', 0),
-                                'total': line.get('progressDetail', {}).get('total', 0)
-                            }
-
-                    self.pull_status = "complete"
-                    logger.info("Image pull completed successfully")
-
-                # Create and start container
-                # Try with GPU first, fallback to CPU if GPU fails
+                            detail = line.get('progressDetail') or {}
+                            self._record_layer_progress(
+                                line['id'],
+                                LAYER_STATUS_CODES.get(line['status'], LAYER_UNKNOWN),
+                                detail.get('current', 0),
+                                detail.get('total', 0)
+                            )
+                finally:
+                    pull_client.close()
+
+                self._image_present(revalidate=True)
+                self.pull_status = "complete"
+                self._invalidate_status()
+                logger.info("Image pull completed successfully")
+
+            # Create and start container
+            run_kwargs = dict(
+                detach=True,
+                environment={
+                    "JUPYTER_PASSWORD": "unsloth"
+                },
+                ports={
+                    "8888/tcp": 8888,
+                    "22/tcp": 2222
+                },
+                volumes={
+                    str(self._get_work_dir()): {
+                        "bind": "/workspace/work",
+                        "mode": "rw"
+                    }
+                }
+            )
+
+            # Only attempt GPU support when the daemon has the nvidia runtime,
+            # fallback to CPU if GPU creation still fails
+            container = None
+            if self._has_gpu():
+                # The GPU attempt runs under a probe name, so a failed attempt never
+                # occupies the real name and can be cleaned up off the startup path
+                probe_name = f"{self.container_name}-gpuprobe-{os.getpid()}"
                 try:
                     logger.info("Attempting to create container with GPU support")
                     container = self.client.containers.run(
                         self.image_name,
-                        name=self.container_name,
-                        detach=True,
-                        environment={
-                            "JUPYTER_PASSWORD": "unsloth"
-                        },
-                        ports={
-                            "8888/tcp": 8888,
-                            "22/tcp": 2222
-                        },
-                        volumes={
-                            str(self._get_work_dir()): {
-                                "bind": "/workspace/work",
-                                "mode": "rw"
-                            }
-                        },
+                        name=probe_name,
                         device_requests=[
                             docker.types.DeviceRequest(count=-1, capabilities=[["gpu"]])
-                        ]
+                        ],
+                        **run_kwargs
                     )
+                    container.rename(self.container_name)
                     logger.info("Container created successfully with GPU")
                 except Exception as gpu_error:
                     logger.warning(f"GPU container creation failed: {gpu_error}")
                     logger.info("Retrying without GPU support...")
+                    container = None
+                    self._reap_container_later(probe_name)
+            else:
+                logger.info("No NVIDIA runtime detected, creating container without GPU")
 
-                    # Clean up failed container if it exists
-                    try:
-                        failed_container = self.client.containers.get(self.container_name)
-                        failed_container.remove(force=True)
-                    except:
-                        pass
-
-                    container = self.client.containers.run(
-                        self.image_name,
-                        name=self.container_name,
-                        detach=True,
-                        environment={
-                            "JUPYTER_PASSWORD": "unsloth"
-                        },
-                        ports={
-                            "8888/tcp": 8888,
-                            "22/tcp": 2222
-                        },
-                        volumes={
-                            str(self._get_work_dir()): {
-                                "bind": "/workspace/work",
-                                "mode": "rw"
-                            }
-                        }
-                    )
-                    logger.info("Container created successfully without GPU (CPU mode)")
+            if container is None:
+                container = self.client.containers.run(
+                    self.image_name, name=self.container_name, **run_kwargs
+                )
+                logger.info("Container created successfully without GPU (CPU mode)")
 
-                return {
-                    "success": True,
-                    "message": "Container created and started",
-                    "container_id": container.short_id
-                }
+            self._invalidate_status()
+            return {
+                "success": True,
+                "message": "Container created and started",
+                "container_id": container.short_id
+            }
 
         except APIError as e:
             logger.error(f"Docker API error: {e}")
@@ -301,6 +521,26 @@ class DockerManager:
             logger.error(f"Error starting container: {e}")
             self.pull_status = "error"
             self.start_error = f"Error starting container: {str(e)}"
+        finally:
+            self._start_done.set()
+
+    def _reap_container_later(self, name, delay=2.0):
+        """Force-remove a leftover container in the background after a short delay"""
+        def reap():
+            try:
+                self.client.containers.get(name).remove(force=True)
+            except NotFound:
+                pass
+            except Exception as e:
+                logger.warning(f"Failed to remove container {name}: {e}")
+
+        timer = threading.Timer(delay, reap)
+        timer.daemon = True
+        timer.start()
+
+    def wait_for_start(self, timeout: float):
+        """Block until the current container start finishes; returns False on timeout"""
+        return self._start_done.wait(timeout)
 
     def stop_container(self):
         """Stop the Unsloth Docker container"""
@@ -311,6 +551,7 @@ class DockerManager:
         try:
             container = client.containers.get(self.container_name)
             container.stop(timeout=10)
+            self._invalidate_status()
             return {
                 "success": True,
                 "message": "Container stopped"
@@ -325,7 +566,9 @@ class DockerManager:
             raise Exception(f"Error stopping container: {str(e)}")
 
     def _has_gpu(self):
-        """Check if NVIDIA GPU is available"""
+        """Check if NVIDIA GPU is available (cached for the process lifetime)"""
+        if self._gpu_available is not None:
+            return self._gpu_available
         try:
             client = self._get_client()
             if not client:
@@ -333,7 +576,8 @@ class DockerManager:
             # Try to get Docker info and check for nvidia runtime
             info = client.info()
             runtimes = info.get("Runtimes", {})
-            return "nvidia" in runtimes
+            self._gpu_available = "nvidia" in runtimes
+            return self._gpu_available
         except Exception:
             return False
 
@@ -342,9 +586,168 @@ class DockerManager:
         from pathlib import Path
         return Path(__file__).parent.parent / "work"
 
+    @staticmethod
+    def _iter_stream_lines(chunks):
+        """Split a raw JSON-lines stream into complete lines, whatever the chunking"""
+        pending = b""
+        for chunk in chunks:
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if pending.strip():
+            yield pending
+
+    def _reset_pull_progress(self):
+        """Clear per-layer pull progress, stored as parallel arrays indexed by layer"""
+        with self._progress_lock:
+            self._layer_index = {}  # layer ID -> index into the arrays below
+            self._layer_status_code = array('b')
+            self._layer_current = array('q')
+            self._layer_total = array('q')
+            self._layer_updated = array('d')  # monotonic time of the last stored update
+            self._layer_logged = array('b')  # last status code logged for the layer
+
+    def _record_layer_progress(self, layer_id, status_code, current, total):
+        """Store the latest status and byte counts for a layer"""
+        now = time.monotonic()
+        idx = self._layer_index.get(layer_id)
+
+        # Skip Downloading events that barely moved since the last stored one;
+        # status transitions are always recorded
+        if (idx is not None
+                and status_code == LAYER_DOWNLOADING
+                and self._layer_status_code[idx] == LAYER_DOWNLOADING
+                and now - self._layer_updated[idx] < PULL_PROGRESS_MIN_INTERVAL
+                and current - self._layer_current[idx] < total * PULL_PROGRESS_MIN_DELTA):
+            return
+
+        with self._progress_lock:
+            if idx is None:
+                self._layer_index[layer_id] = len(self._layer_status_code)
+                self._layer_status_code.append(status_code)
+                self._layer_current.append(current)
+                self._layer_total.append(total)
+                self._layer_updated.append(now)
+                self._layer_logged.append(-1)
+                idx = self._layer_index[layer_id]
+            else:
+                self._layer_status_code[idx] = status_code
+                self._layer_current[idx] = current
+                self._layer_total[idx] = total
+                self._layer_updated[idx] = now
+
+        # Log once per status change rather than once per streamed event
+        if status_code != self._layer_logged[idx]:
+            self._layer_logged[idx] = status_code
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("layer %s: %s", layer_id[:12], LAYER_STATUS_NAMES.get(status_code, "Pending"))
+
+    def _exec_python_script(self, container_id, script, environment=None, stdin_data=b""):
+        """Start python in a container and feed it the script, then stdin_data, over stdin.
+
+        Returns (exec_id, sock); the caller reads the output frames and closes sock.
+        """
+        api = self._get_client().api
+        exec_id = api.exec_create(
+            container_id, ["python", "-c", _STDIN_LOADER],
+            stdin=True, stdout=True, stderr=True, environment=environment
+        )["Id"]
+
+        source = script.encode("utf-8")
+        sock = api.exec_start(exec_id, socket=True)
+        try:
+            raw = getattr(sock, "_sock", sock)
+            raw.sendall(b"%d\n" % len(source) + source + stdin_data)
+        except Exception:
+            sock.close()
+            raise
+        return exec_id, sock
+
+    def run_python_script(self, container_id, script, environment=None, stdin_data=b""):
+        """Run a Python script inside a container by piping it to python over stdin.
+
+        Nothing is written to the shared work directory, so concurrent runs can't
+        clobber each other's scripts. stdin_data is left on stdin for the script.
+        Returns (exit_code, stdout, stderr) as bytes.
+        """
+        exec_id, sock = self._exec_python_script(container_id, script, environment, stdin_data)
+        try:
+            frames = (demux_adaptor(*frame) for frame in frames_iter(sock, tty=False))
+            stdout, stderr = consume_socket_output(frames, demux=True)
+        finally:
+            sock.close()
+
+        exit_code = self._get_client().api.exec_inspect(exec_id)["ExitCode"]
+        return exit_code, stdout or b"", stderr or b""
+
+    def stream_python_script(self, container_id, script, environment=None):
+        """Like run_python_script, but yield stdout and stderr chunks as the script produces them"""
+        _, sock = self._exec_python_script(container_id, script, environment)
+        try:
+            for _, data in frames_iter(sock, tty=False):
+                yield data
+        finally:
+            sock.close()
+
+    def _start_inference_server(self, container_id):
+        """Launch the warm inference server in the background inside the container"""
+        with self._inference_server_lock:
+            # Concurrent first requests share a single launch
+            started = self._inference_server_started.get(container_id)
+            if started and time.monotonic() - started < INFERENCE_SERVER_START_TIMEOUT:
+                return
+
+            api = self._get_client().api
+            exec_id = api.exec_create(
+                container_id, ["python", "-c", INFERENCE_SERVER_SOURCE],
+                environment={"INFERENCE_SOCKET": INFERENCE_SOCKET}
+            )["Id"]
+            api.exec_start(exec_id, detach=True)
+            self._inference_server_started[container_id] = time.monotonic()
+            logger.info("Started warm inference server in container")
+
+    def run_inference(self, container_id, model_path, prompt, max_tokens, temperature, revision=None):
+        """Generate text with the container's warm inference server, starting it if needed.
+
+        Returns the server's reply, either {"result": text} or {"error": message}.
+        """
+        # Sent over stdin, which has no size limit and stays out of the exec metadata
+        request = orjson.dumps({
+            "model_path": model_path,
+            "revision": revision,
+            "prompt": prompt,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }) + b"\n"
+        environment = {
+            "INFERENCE_SOCKET": INFERENCE_SOCKET,
+            "CONNECT_TIMEOUT": "0",
+        }
+
+        exit_code, stdout, stderr = self.run_python_script(
+            container_id, INFERENCE_CLIENT_SCRIPT, environment, request
+        )
+        if exit_code == INFERENCE_SERVER_DOWN:
+            self._start_inference_server(container_id)
+            environment["CONNECT_TIMEOUT"] = str(INFERENCE_SERVER_START_TIMEOUT)
+            exit_code, stdout, stderr = self.run_python_script(
+                container_id, INFERENCE_CLIENT_SCRIPT, environment, request
+            )
+
+        if exit_code != 0 or not stdout:
+            if exit_code == INFERENCE_SERVER_DOWN:
+                return {"error": "Inference server did not start"}
+            return {"error": (stderr or stdout).decode("utf-8", errors="replace") or "Inference failed"}
+        return orjson.loads(stdout)
+
     def get_pull_progress(self):
         """Get current pull progress"""
-        total_layers = len(self.pull_progress)
+        # Snapshot under the lock so the counts below never see a half-written update
+        with self._progress_lock:
+            statuses = self._layer_status_code[:]
+        total_layers = len(statuses)
         if total_layers == 0:
             return {
                 "status": self.pull_status,
@@ -353,10 +756,8 @@ class DockerManager:
             }
 
         # Calculate overall progress
-        completed = sum(1 for p in self.pull_progress.values()
-                       if p['status'] in ['Pull complete', 'Already exists'])
-        downloading = sum(1 for p in self.pull_progress.values()
-                         if p['status'] == 'Downloading')
+        completed = statuses.count(LAYER_PULL_COMPLETE) + statuses.count(LAYER_ALREADY_EXISTS)
+        downloading = statuses.count(LAYER_DOWNLOADING)
 
         progress_pct = (completed / total_layers * 100) if total_layers > 0 else 0
 
@@ -375,11 +776,21 @@ class DockerManager:
         if not client:
             raise Exception("Docker is not available")
 
+        with self._status_lock:
+            if self._models_result is not None and time.monotonic() - self._models_result_ts < self._models_ttl:
+                return self._models_result
+
+        result = self._fetch_available_models(client)
+        with self._status_lock:
+            self._models_result = result
+            self._models_result_ts = time.monotonic()
+        return result
+
+    def _fetch_available_models(self, client):
+        """Find a running Unsloth container and read the model list from its image"""
         try:
             # Find ANY running Unsloth container
-            running_containers = client.containers.list(
-                filters={"ancestor": self.image_name, "status": "running"}
-            )
+            running_containers = [c for c in self._containers_snapshot() if c["State"] == "running"]
 
             if not running_containers:
                 # Return default models if no container is running
@@ -387,40 +798,57 @@ class DockerManager:
 
             container = running_containers[0]
 
-            # Execute command to parse the mapper.py file from Unsloth package
-            # This extracts all model names directly from Unsloth's source code
-            exec_result = container.exec_run([
-                "bash", "-c",
-                'python -c \'import re, json; content = open("/opt/conda/lib/python3.11/site-packages/unsloth/models/mapper.py").read(); models = sorted(set(re.findall(r"\\\"(unsloth/[^\\\"]+)\\\"", content))); print(json.dumps(models))\''
-            ], stdout=True, stderr=True)
-
-            if exec_result.exit_code == 0:
-                import json
-                models = json.loads(exec_result.output.decode('utf-8').strip())
-                if models and len(models) > 0:
-                    logger.info(f"Found {len(models)} models from Unsloth package")
-                    return {"models": models}
-                else:
-                    logger.warning("No models found in mapper.py, using defaults")
-                    return self._get_default_models()
+            # The model list only changes with the image, so it is cached per image ID
+            models_cache = self._load_models_cache()
+            image_id = container.get('ImageID')
+            if image_id in models_cache:
+                return {"models": models_cache[image_id]}
+
+            # Copy mapper.py out of the container and extract model names on the host
+            chunks, _ = client.api.get_archive(container["Id"], MAPPER_PATH)
+            with tarfile.open(fileobj=BytesIO(b"".join(chunks))) as tar:
+                member = tar.next()
+                data = tar.extractfile(member).read() if member else b""
+
+            models = sorted({m.group(1).decode() for m in _MAPPER_RE.finditer(data)})
+            if models:
+                logger.info(f"Found {len(models)} models from Unsloth package")
+                self._save_models_cache(image_id, models)
+                return {"models": models}
             else:
-                logger.warning(f"Failed to get models from container: {exec_result.output.decode('utf-8')}")
+                logger.warning("No models found in mapper.py, using defaults")
                 return self._get_default_models()
 
         except Exception as e:
             logger.error(f"Error getting available models: {e}")
             return self._get_default_models()
 
+    def _models_cache_file(self):
+        """Get the path of the persisted model list cache"""
+        return self._get_work_dir() / ".models_cache.json"
+
+    def _load_models_cache(self):
+        """Load the per-image model list cache from disk on first use"""
+        if self._models_cache is None:
+            self._models_cache = {}
+            try:
+                self._models_cache = json.loads(self._models_cache_file().read_text())
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable models cache: {e}")
+        return self._models_cache
+
+    def _save_models_cache(self, image_id, models):
+        """Remember the model list for an image, in memory and on disk"""
+        if not image_id:
+            return
+        self._load_models_cache()[image_id] = models
+        try:
+            self._models_cache_file().write_text(json.dumps(self._models_cache))
+        except Exception as e:
+            logger.warning(f"Could not persist models cache: {e}")
+
     def _get_default_models(self):
-        """Return default list of popular Unsloth models"""
-        return {
-            "models": [
-                "unsloth/llama-3.1-8b-bnb-4bit",
-                "unsloth/mistral-7b-v0.3-bnb-4bit",
-                "unsloth/Qwen2.5-7B-bnb-4bit",
-                "unsloth/gemma-2-9b-bnb-4bit",
-                "unsloth/Phi-3.5-mini-instruct",
-                "unsloth/llama-3.2-1b-instruct-bnb-4bit",
-                "unsloth/llama-3.2-3b-instruct-bnb-4bit",
-            ]
-        }
+        """Return default list of popular Unsloth models, as a fresh payload per call"""
+        return {"models": list(DEFAULT_MODELS)}
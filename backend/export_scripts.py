@@ -0,0 +1,88 @@
+"""Scripts run inside the Unsloth container to export trained models.
+
+They are fixed text. Per-request values (model path, output path, quantization)
+arrive through the exec environment, so nothing from a request is ever spliced
+into Python source.
+"""
+
+GGUF_EXPORT_SCRIPT = '''
+import os
+import sys
+from unsloth import FastLanguageModel
+
+try:
+    output_path = os.environ["OUTPUT_PATH"]
+    quantization = os.environ["QUANTIZATION"]
+
+    print("Loading model for GGUF export...")
+    model, tokenizer = FastLanguageModel.from_pretrained(
+        model_name=os.environ["MODEL_PATH"],
+        max_seq_length=2048,
+        dtype=None,
+        load_in_4bit=True,
+    )
+
+    print(f"Exporting to GGUF format (quantization: {quantization})...")
+    model.save_pretrained_gguf(
+        output_path,
+        tokenizer,
+        quantization_method=quantization
+    )
+
+    print("EXPORT_SUCCESS")
+    print(f"Model exported to: {output_path}")
+
+except Exception as e:
+    print(f"ERROR: {str(e)}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+'''
+
+OLLAMA_EXPORT_SCRIPT = '''
+import os
+import sys
+from unsloth import FastLanguageModel
+
+try:
+    output_path = os.environ["OUTPUT_PATH"]
+    modelfile_name = os.environ["MODELFILE_NAME"]
+
+    print("Loading model for Ollama export...")
+    model, tokenizer = FastLanguageModel.from_pretrained(
+        model_name=os.environ["MODEL_PATH"],
+        max_seq_length=2048,
+        dtype=None,
+        load_in_4bit=True,
+    )
+
+    print("Exporting to GGUF format for Ollama...")
+    model.save_pretrained_gguf(
+        output_path,
+        tokenizer,
+        quantization_method="q4_k_m"
+    )
+
+    # Create Modelfile for Ollama
+    modelfile_content = f"""FROM {output_path}
+PARAMETER temperature 0.7
+PARAMETER top_p 0.9
+PARAMETER stop "<|im_end|>"
+"""
+
+    with open(f"/workspace/work/models/Modelfile.{modelfile_name}", "w") as f:
+        f.write(modelfile_content)
+
+    print("EXPORT_SUCCESS")
+    print(f"Model exported to: {output_path}")
+    print(f"Modelfile created: Modelfile.{modelfile_name}")
+    print("")
+    print("To use with Ollama, run:")
+    print(f"  ollama create {modelfile_name} -f work/models/Modelfile.{modelfile_name}")
+
+except Exception as e:
+    print(f"ERROR: {str(e)}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+'''
@@ -0,0 +1,224 @@
+"""Warm inference server that runs inside the Unsloth container.
+
+DockerManager starts this once per container, and it then stays resident, so
+models are loaded on first use and reused by later requests rather than being
+reloaded every time. It listens on a Unix socket. Each connection carries one
+JSON request line and gets one JSON response line back. Prompts for the same
+model and settings that arrive within a short window are generated together
+in a single batch.
+
+Loaded models are freed again after INFERENCE_IDLE_UNLOAD seconds without
+requests, and a {"command": "shutdown"} request frees them and stops the server,
+which the training manager sends before a run so the GPU is left to the trainer.
+"""
+import asyncio
+import gc
+import json
+import os
+import socket
+import traceback
+from collections import OrderedDict
+
+SOCKET_PATH = os.environ.get("INFERENCE_SOCKET", "/tmp/unsloth_inference.sock")
+CACHE_SIZE = max(1, int(os.environ.get("INFERENCE_CACHE_SIZE", "1")))
+BATCH_WINDOW = float(os.environ.get("INFERENCE_BATCH_WINDOW", "0.01"))  # seconds
+IDLE_UNLOAD = float(os.environ.get("INFERENCE_IDLE_UNLOAD", "300"))  # seconds
+
+# (model_path, revision) -> (model, tokenizer), least recently used first
+_models = OrderedDict()
+
+
+def _load_model(model_path, revision):
+    """Return a cached model, loading it and evicting the oldest when the cache is full"""
+    key = (model_path, revision)
+    if key in _models:
+        _models.move_to_end(key)
+        return _models[key]
+
+    import torch
+    from unsloth import FastLanguageModel
+
+    while len(_models) >= CACHE_SIZE:
+        _models.popitem(last=False)
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    print(f"Loading model {model_path}...", flush=True)
+    model, tokenizer = FastLanguageModel.from_pretrained(
+        model_name=model_path,
+        max_seq_length=2048,
+        dtype=None,
+        load_in_4bit=True,
+    )
+    FastLanguageModel.for_inference(model)
+
+    # Left padding keeps every prompt flush against its generated tokens in a batch
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    _models[key] = (model, tokenizer)
+    return model, tokenizer
+
+
+def _unload_models():
+    """Drop every cached model and hand its GPU memory back"""
+    if not _models:
+        return
+
+    import torch
+
+    _models.clear()
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    print("Unloaded models", flush=True)
+
+
+def _generate(key, prompts):
+    """Run one batched generate call for prompts sharing the same model and settings"""
+    model_path, revision, max_tokens, temperature = key
+    model, tokenizer = _load_model(model_path, revision)
+
+    inputs = tokenizer(prompts, return_tensors="pt", padding=True).to(model.device)
+    outputs = model.generate(
+        **inputs,
+        max_new_tokens=max_tokens,
+        temperature=temperature,
+        use_cache=True
+    )
+
+    # Skip each row's left padding so a batched result reads like a single one
+    starts = inputs["attention_mask"].argmax(dim=1).tolist()
+    return [tokenizer.decode(row[start:]) for row, start in zip(outputs, starts)]
+
+
+async def _batch_worker(requests):
+    """Collect requests for a short window and run each group as one batch.
+
+    Models are only loaded and freed here, so an unload never overlaps a generate.
+    """
+    loop = asyncio.get_running_loop()
+    deferred = []
+
+    while True:
+        if deferred:
+            first = deferred.pop(0)
+        else:
+            try:
+                # With a model loaded, free it once nothing arrives for IDLE_UNLOAD
+                first = await asyncio.wait_for(requests.get(), IDLE_UNLOAD if _models else None)
+            except asyncio.TimeoutError:
+                await loop.run_in_executor(None, _unload_models)
+                continue
+
+        if first[0] is None:
+            # Shutdown request: free the GPU before the caller is answered
+            await loop.run_in_executor(None, _unload_models)
+            first[2].set_result(None)
+            continue
+
+        batch = [first]
+
+        deadline = loop.time() + BATCH_WINDOW
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(requests.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            (batch if item[0] == first[0] else deferred).append(item)
+
+        prompts = [prompt for _, prompt, _ in batch]
+        try:
+            results = await loop.run_in_executor(None, _generate, first[0], prompts)
+        except Exception as e:
+            details = traceback.format_exc()
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError(f"{e}\n{details}"))
+            continue
+
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+async def _handle(reader, writer, requests, stopping):
+    """Serve one request line and reply with the generated text or the error"""
+    try:
+        line = await reader.readline()
+        if not line:
+            return  # liveness probe
+
+        shutdown = False
+        try:
+            request = json.loads(line)
+            future = asyncio.get_running_loop().create_future()
+            if request.get("command") == "shutdown":
+                # Queued like a generate, so one in progress finishes first
+                await requests.put((None, None, future))
+                await future
+                reply = {"result": "shutdown"}
+                shutdown = True
+            else:
+                key = (
+                    request["model_path"],
+                    request.get("revision"),
+                    int(request["max_tokens"]),
+                    float(request["temperature"]),
+                )
+                await requests.put((key, request["prompt"], future))
+                reply = {"result": await future}
+        except Exception as e:
+            reply = {"error": str(e)}
+
+        writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+        await writer.drain()
+        if shutdown:
+            stopping.set()
+    except OSError:
+        pass
+    finally:
+        writer.close()
+
+
+def _already_serving():
+    """Check whether another server instance already owns the socket"""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(SOCKET_PATH)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+async def main():
+    if _already_serving():
+        return
+
+    if os.path.exists(SOCKET_PATH):
+        os.unlink(SOCKET_PATH)
+
+    requests = asyncio.Queue()
+    stopping = asyncio.Event()
+    worker = asyncio.create_task(_batch_worker(requests))
+    server = await asyncio.start_unix_server(
+        lambda reader, writer: _handle(reader, writer, requests, stopping), SOCKET_PATH
+    )
+    print(f"Inference server listening on {SOCKET_PATH}", flush=True)
+
+    async with server:
+        try:
+            await stopping.wait()
+        finally:
+            worker.cancel()
+    print("Inference server stopped", flush=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,18 +1,50 @@
-from fastapi import FastAPI, UploadFile, File, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, UploadFile, File, WebSocket, WebSocketDisconnect, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
+import aiofiles
+import asyncio
+import orjson
 import os
+import re
+import threading
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-import json
+from typing import Optional
+import hashlib
+import ijson
+import time
+import uuid
+import zlib
+
+try:
+    from huggingface_hub import HfApi
+except ImportError:
+    HfApi = None
+
+try:
+    from datasets import load_dataset
+except ImportError:
+    load_dataset = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.json as pa_json
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
 
 from docker_manager import DockerManager
 from training_manager import TrainingManager
 from database import Database
 from dataset_validator import DatasetValidator
 from resource_monitor import ResourceMonitor
+from export_scripts import GGUF_EXPORT_SCRIPT, OLLAMA_EXPORT_SCRIPT
 
-app = FastAPI(title="Slothbuckler API")
+app = FastAPI(title="Slothbuckler API", default_response_class=ORJSONResponse)
 
 # CORS middleware for local development
 app.add_middleware(
@@ -35,8 +67,43 @@ DATASETS_DIR = WORK_DIR / "datasets"
 MODELS_DIR = WORK_DIR / "models"
 CONFIG_DIR = WORK_DIR / "config"
 
+# Column names tried, in order, when auto-detecting a dataset's text field
+COMMON_TEXT_FIELDS = ('text', 'prompt', 'instruction', 'input', 'question', 'content')
+
+# JSON datasets at least this large are counted by streaming instead of loading
+JSON_STREAM_THRESHOLD = 10 * 1024 * 1024
+
+# HF dataset search results are reused for this long, for up to this many queries
+HF_SEARCH_TTL = 300  # seconds
+HF_SEARCH_CACHE_SIZE = 512
+_HF_SEARCH_CACHE = {}  # (token, query, limit) -> (monotonic timestamp, results)
+
+# Uploads are copied to disk in chunks of this many bytes
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Parquet copies of datasets used for row pagination; the leading dot keeps
+# the directory out of dataset listings
+DATASET_PARQUET_DIR = DATASETS_DIR / ".parquet"
+PARQUET_ROW_GROUP_SIZE = 10_000
+PARQUET_HANDLE_CACHE_SIZE = 8
+_PARQUET_FILES = {}  # (parquet path, mtime_ns) -> memory-mapped ParquetFile
+_PARQUET_FILES_LOCK = threading.Lock()  # _open_parquet runs in worker threads
+
+# sha256 of each uploaded dataset as "<digest> <mtime_ns> <size>", so re-uploading
+# identical content under the same name leaves the file (and its cached stats) alone
+DATASET_DIGEST_DIR = DATASETS_DIR / ".digests"
+
+# Memoized scan results, keyed so that any modification invalidates the entry:
+# dataset row counts by (path, mtime_ns, size), model dir sizes by (path, mtime_ns)
+_ROW_CACHE = {}
+_row_cache_seeded = False  # _ROW_CACHE is seeded from the database on the first scan
+_dir_size_cache_seeded = False  # likewise for _DIR_SIZE_CACHE
+_DIR_SIZE_CACHE = {}
+
 # Ensure directories exist
 DATASETS_DIR.mkdir(parents=True, exist_ok=True)
+DATASET_PARQUET_DIR.mkdir(exist_ok=True)
+DATASET_DIGEST_DIR.mkdir(exist_ok=True)
 MODELS_DIR.mkdir(parents=True, exist_ok=True)
 CONFIG_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -53,7 +120,7 @@ class DockerStatus(BaseModel):
     message: str
 
 class TrainingConfig(BaseModel):
-    model_config = {"protected_namespaces": ()}
+    model_config = {"protected_namespaces": (), "frozen": True}
 
     model_name: str
     dataset_path: str
@@ -65,6 +132,8 @@ class TrainingConfig(BaseModel):
     lora_r: int = 16
     lora_alpha: int = 16
     output_dir: str
+    dataset_num_proc: Optional[int] = None  # defaults to the container's cores, up to 8
+    logging_steps: Optional[int] = None  # defaults to about 200 log points per run
 
 class ModelInfo(BaseModel):
     name: str
@@ -75,33 +144,71 @@ class HFToken(BaseModel):
     token: str
 
 
+# ============= CONDITIONAL RESPONSES =============
+
+def _dir_etag(path, *variant):
+    """Weak ETag that changes whenever an entry in the directory is added, removed or modified.
+
+    Extra variant values (e.g. query parameters) are folded into the tag.
+    """
+    max_mtime = path.stat().st_mtime_ns
+    count = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            count += 1
+            max_mtime = max(max_mtime, entry.stat(follow_symlinks=False).st_mtime_ns)
+    return '-'.join([f'W/"{max_mtime:x}', str(count), *map(str, variant)]) + '"'
+
+def _payload_etag(payload):
+    """Weak ETag derived from the serialized payload"""
+    return f'W/"{zlib.crc32(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)):x}"'
+
+def _not_modified(request: Request, etag: str):
+    """304 response if the client already holds the representation tagged etag"""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
 # ============= DOCKER ENDPOINTS =============
 
-@app.get("/api/docker/status", response_model=DockerStatus)
-async def get_docker_status():
+# Schema is documented only; the dict is serialized as-is without a validation pass
+@app.get("/api/docker/status", responses={200: {"model": DockerStatus}})
+async def get_docker_status(request: Request, response: Response):
     """Check if Docker is installed and Unsloth container is running"""
-    return docker_manager.get_status()
+    status = await asyncio.to_thread(docker_manager.get_status)
+    etag = _payload_etag(status)
+    response.headers["ETag"] = etag
+    return _not_modified(request, etag) or status
 
 @app.get("/api/docker/containers")
 async def list_docker_containers():
     """List all Unsloth Docker containers"""
-    return docker_manager.list_containers()
+    return await asyncio.to_thread(docker_manager.list_containers)
 
 @app.post("/api/docker/start")
 async def start_docker_container():
     """Start the Unsloth Docker container"""
     try:
-        result = docker_manager.start_container()
-        return result
+        return await asyncio.to_thread(docker_manager.start_container)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/docker/start/wait")
+def wait_for_docker_start(timeout: float = 30.0):
+    """Wait for an in-progress container start to finish (up to 60 seconds)"""
+    done = docker_manager.wait_for_start(min(max(timeout, 0.0), 60.0))
+    return {
+        "done": done,
+        "pull_status": docker_manager.pull_status,
+        "error": docker_manager.start_error
+    }
+
 @app.post("/api/docker/stop")
 async def stop_docker_container():
     """Stop the Unsloth Docker container"""
     try:
-        result = docker_manager.stop_container()
-        return result
+        return await asyncio.to_thread(docker_manager.stop_container)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -117,130 +224,445 @@ async def get_docker_pull_progress():
 async def get_available_models():
     """Get list of available Unsloth models"""
     try:
-        return docker_manager.get_available_models()
+        return await asyncio.to_thread(docker_manager.get_available_models)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # ============= DATASET ENDPOINTS =============
 
+async def _upload_chunks(file: UploadFile):
+    """Yield an UploadFile's contents in UPLOAD_CHUNK_SIZE pieces"""
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+async def _write_chunks(chunks, path):
+    """Stream chunks to path; returns (size, sha256 hex digest)"""
+    size = 0
+    hasher = hashlib.sha256()
+    async with aiofiles.open(path, "wb") as f:
+        async for chunk in chunks:
+            hasher.update(chunk)
+            await f.write(chunk)
+            size += len(chunk)
+    return size, hasher.hexdigest()
+
+def _stored_digest(file_path):
+    """Digest recorded when a dataset was uploaded, or None if unknown or the file changed since"""
+    try:
+        digest, mtime_ns, size = (DATASET_DIGEST_DIR / f"{file_path.name}.sha256").read_text().split()
+        stat = file_path.stat()
+    except (OSError, ValueError):
+        return None
+    if (int(mtime_ns), int(size)) != (stat.st_mtime_ns, stat.st_size):
+        return None
+    return digest
+
+async def _store_dataset(chunks, filename):
+    """Save an uploaded dataset under its own name, skipping the write if the content is unchanged"""
+    # Strip any directory components so uploads can't escape the datasets dir
+    filename = os.path.basename(filename or "")
+    if not filename:
+        raise HTTPException(status_code=400, detail="Invalid filename")
+    tmp_path = DATASETS_DIR / f".{uuid.uuid4().hex}.part"
+
+    # Stream the upload to disk in chunks rather than buffering it in memory,
+    # hashing as we go so a repeat upload of the same file can be recognized
+    try:
+        size, digest = await _write_chunks(chunks, tmp_path)
+
+        file_path = DATASETS_DIR / filename
+        if _stored_digest(file_path) == digest:
+            # Same content already uploaded; keep the existing file untouched
+            tmp_path.unlink()
+        else:
+            os.replace(tmp_path, file_path)
+            stat = file_path.stat()
+            (DATASET_DIGEST_DIR / f"{filename}.sha256").write_text(
+                f"{digest} {stat.st_mtime_ns} {stat.st_size}"
+            )
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    return {
+        "success": True,
+        "filename": filename,
+        "path": str(file_path),
+        "size": size
+    }
+
 @app.post("/api/datasets/upload")
 async def upload_dataset(file: UploadFile = File(...)):
     """Upload a dataset file (JSON, JSONL, CSV)"""
     try:
-        file_path = DATASETS_DIR / file.filename
-
-        # Save uploaded file
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-
-        return {
-            "success": True,
-            "filename": file.filename,
-            "path": str(file_path),
-            "size": len(content)
-        }
+        return await _store_dataset(_upload_chunks(file), file.filename)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/datasets/list")
-async def list_datasets():
-    """List all uploaded datasets"""
+@app.post("/api/datasets/upload/raw")
+async def upload_dataset_raw(request: Request, filename: str):
+    """Upload a dataset sent as the raw request body, bypassing multipart parsing"""
     try:
-        datasets = []
-        for file_path in DATASETS_DIR.iterdir():
-            if file_path.is_file():
-                stat = file_path.stat()
+        return await _store_dataset(request.stream(), filename)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _count_lines(path):
+    """Count lines by scanning raw bytes for newlines in 1 MiB blocks"""
+    n = 0
+    last = b"\n"
+    with open(path, "rb", buffering=0) as f:
+        while buf := f.read(1 << 20):
+            n += buf.count(b"\n")
+            last = buf[-1:]
+    # A final line without a trailing newline still counts
+    return n + (last != b"\n")
+
+def _json_rowcount(path):
+    """Rows in a JSON dataset: items of a top-level array, otherwise 1"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < JSON_STREAM_THRESHOLD:
+            data = orjson.loads(f.read())
+            return len(data) if isinstance(data, list) else 1
+
+        # Large files: check the first significant byte, then stream array items
+        head = f.read(4096).lstrip()
+        if not head.startswith(b"["):
+            return 1
+        f.seek(0)
+        return sum(1 for _ in ijson.items(f, "item"))
+
+def _dir_size(root):
+    """Total size of regular files under root, walked with os.scandir"""
+    total = 0
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+def _page_info(total, offset, page):
+    """Pagination fields shared by the list endpoints"""
+    next_offset = offset + len(page)
+    return {
+        "total_count": total,
+        "offset": offset,
+        "returned_count": len(page),
+        "pagination": {
+            "has_next": next_offset < total,
+            "next_offset": next_offset if next_offset < total else None
+        }
+    }
+
+def _scan_datasets(offset=0, limit=None, include_rows=True):
+    """Collect stats for one page of uploaded datasets, sorted by name (blocking work).
+
+    Returns (total_count, page). Row counts are only computed when include_rows is set.
+    """
+    global _row_cache_seeded
+    if not _row_cache_seeded:
+        # Row counts persisted by earlier runs of the server
+        for path, (mtime_ns, size, rows) in db.get_dataset_row_counts().items():
+            _ROW_CACHE[(path, mtime_ns, size)] = rows
+        _row_cache_seeded = True
+
+    # Hidden files are in-progress uploads. DirEntry answers is_file() from the
+    # directory listing and caches stat(), so each file costs at most one stat call
+    with os.scandir(DATASETS_DIR) as it:
+        files = sorted(
+            (e for e in it if not e.name.startswith('.') and e.is_file(follow_symlinks=False)),
+            key=lambda e: e.name
+        )
+    end = None if limit is None else offset + limit
+
+    datasets = []
+    page_keys = {}
+    for file_entry in files[offset:end]:
+        stat = file_entry.stat(follow_symlinks=False)
+        entry = {
+            "name": file_entry.name,
+            "size": stat.st_size,
+            "created": stat.st_ctime,
+            "source": "local"  # local upload or pulled from HF
+        }
 
-                # Count rows if it's a JSON/JSONL file
-                rows = None
+        if include_rows:
+            key = (file_entry.path, stat.st_mtime_ns, stat.st_size)
+            page_keys[key[0]] = key
+
+            # Count rows if it's a JSON/JSONL file, unless unchanged since the last scan
+            rows = _ROW_CACHE.get(key)
+            if key not in _ROW_CACHE:
+                suffix = os.path.splitext(file_entry.name)[1]
                 try:
-                    if file_path.suffix in ['.json', '.jsonl']:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            if file_path.suffix == '.jsonl':
-                                rows = sum(1 for _ in f)
-                            else:
-                                data = json.load(f)
-                                rows = len(data) if isinstance(data, list) else 1
+                    if suffix == '.jsonl':
+                        rows = _count_lines(file_entry.path)
+                    elif suffix == '.json':
+                        rows = _json_rowcount(file_entry.path)
                 except:
                     pass
+                _ROW_CACHE[key] = rows
+                db.set_dataset_row_count(*key, rows)
+            entry["rows"] = rows
+
+        datasets.append(entry)
+
+    # Drop entries for deleted files, and superseded entries for modified ones on this page
+    paths = {e.path for e in files}
+    stale = [key for key in list(_ROW_CACHE)
+             if key[0] not in paths or page_keys.get(key[0], key) != key]
+    for key in stale:
+        _ROW_CACHE.pop(key, None)
+    if any(key[0] not in paths for key in stale):
+        db.prune_dataset_row_counts(list(paths))
+    return len(files), datasets
+
+@app.get("/api/datasets/list")
+async def list_datasets(request: Request, offset: int = 0, limit: Optional[int] = None,
+                        include_rows: bool = True):
+    """List uploaded datasets, a page at a time; all of them unless limit is given"""
+    try:
+        offset, limit = max(offset, 0), None if limit is None else max(limit, 0)
+        etag = await asyncio.to_thread(_dir_etag, DATASETS_DIR, offset, limit, int(include_rows))
+        not_modified = _not_modified(request, etag)
+        if not_modified:
+            return not_modified
+
+        # Scan in a worker thread so disk I/O doesn't block the event loop
+        total, datasets = await asyncio.to_thread(_scan_datasets, offset, limit, include_rows)
+
+        # Plain-typed payload, so it skips jsonable_encoder and goes straight to orjson
+        return ORJSONResponse(
+            {"datasets": datasets, **_page_info(total, offset, datasets)},
+            headers={"ETag": etag}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _write_json_parquet(dataset_path, parquet_path):
+    """Convert a JSON dataset to Parquet, streaming the items of large top-level arrays"""
+    with open(dataset_path, "rb") as f:
+        if (os.fstat(f.fileno()).st_size < JSON_STREAM_THRESHOLD
+                or not f.read(4096).lstrip().startswith(b"[")):
+            f.seek(0)
+            data = orjson.loads(f.read())
+            table = pa.Table.from_pylist(data if isinstance(data, list) else [data])
+            pq.write_table(table, parquet_path, row_group_size=PARQUET_ROW_GROUP_SIZE)
+            return
+
+        f.seek(0)
+        items = ijson.items(f, "item", use_float=True)
+        writer = None
+        try:
+            # One row group per batch; later batches are coerced to the first one's schema
+            while batch := list(islice(items, PARQUET_ROW_GROUP_SIZE)):
+                if writer is None:
+                    table = pa.Table.from_pylist(batch)
+                    writer = pq.ParquetWriter(parquet_path, table.schema)
+                else:
+                    table = pa.Table.from_pylist(batch, schema=writer.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+def _dataset_parquet(dataset_path):
+    """Path of a Parquet copy of a dataset, converting it first if missing or stale (blocking).
+
+    Conversion happens on the first row request rather than at upload, so datasets
+    that are never browsed don't take up disk twice. Returns None for formats or
+    contents that can't be converted, or when pyarrow isn't installed.
+    """
+    if pa is None:
+        return None
+
+    suffix = dataset_path.suffix.lower()
+    parquet_path = DATASET_PARQUET_DIR / f"{dataset_path.name}.parquet"
+    try:
+        if parquet_path.stat().st_mtime_ns >= dataset_path.stat().st_mtime_ns:
+            return parquet_path
+    except FileNotFoundError:
+        pass
+
+    if suffix not in ('.jsonl', '.csv', '.json'):
+        return None
 
-                datasets.append({
-                    "name": file_path.name,
-                    "size": stat.st_size,
-                    "created": stat.st_ctime,
-                    "rows": rows,
-                    "source": "local"  # local upload or pulled from HF
-                })
-        return {"datasets": datasets}
+    # Write under a unique temp name so concurrent conversions never see a partial file
+    tmp_path = DATASET_PARQUET_DIR / f".{uuid.uuid4().hex}.part"
+    try:
+        if suffix == '.jsonl':
+            table = pa_json.read_json(dataset_path)
+            pq.write_table(table, tmp_path, row_group_size=PARQUET_ROW_GROUP_SIZE)
+        elif suffix == '.csv':
+            table = pa_csv.read_csv(dataset_path)
+            pq.write_table(table, tmp_path, row_group_size=PARQUET_ROW_GROUP_SIZE)
+        else:
+            _write_json_parquet(dataset_path, tmp_path)
+        os.replace(tmp_path, parquet_path)
+    except (pa.ArrowException, orjson.JSONDecodeError, ijson.JSONError, OSError):
+        return None
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return parquet_path
+
+def _open_parquet(parquet_path):
+    """Memory-mapped ParquetFile for a path, reused until the file changes"""
+    key = (str(parquet_path), parquet_path.stat().st_mtime_ns)
+    with _PARQUET_FILES_LOCK:
+        pf = _PARQUET_FILES.pop(key, None)
+        if pf is None:
+            pf = pq.ParquetFile(pa.memory_map(str(parquet_path), 'r'))
+        _PARQUET_FILES[key] = pf
+        if len(_PARQUET_FILES) > PARQUET_HANDLE_CACHE_SIZE:
+            # Dicts keep insertion order, so the first key is the least recently used
+            _PARQUET_FILES.pop(next(iter(_PARQUET_FILES)))
+    return pf
+
+def _read_dataset_rows(dataset_path, offset, limit, columns):
+    """One page of dataset rows, decoding only the row groups that overlap it (blocking)"""
+    parquet_path = _dataset_parquet(dataset_path)
+    if parquet_path is None:
+        return None
+
+    pf = _open_parquet(parquet_path)
+    total = pf.metadata.num_rows
+    end = min(offset + limit, total)
+
+    groups = []
+    first_row = None
+    start = 0
+    for i in range(pf.metadata.num_row_groups):
+        group_rows = pf.metadata.row_group(i).num_rows
+        if start < end and start + group_rows > offset:
+            groups.append(i)
+            if first_row is None:
+                first_row = start
+        start += group_rows
+
+    if not groups:
+        return total, []
+    table = pf.read_row_groups(groups, columns=columns)
+    return total, table.slice(offset - first_row, end - offset).to_pylist()
+
+@app.get("/api/datasets/{dataset_name}/rows")
+async def get_dataset_rows(dataset_name: str, offset: int = 0, limit: int = 50, columns: str = ""):
+    """Page through a local dataset's rows without loading the whole file"""
+    if pa is None:
+        raise HTTPException(status_code=501, detail="pyarrow is not installed")
+    try:
+        dataset_path = DATASETS_DIR / os.path.basename(dataset_name)
+        if dataset_name.startswith('.') or not dataset_path.is_file():
+            raise HTTPException(status_code=404, detail="Dataset not found")
+
+        offset, limit = max(offset, 0), min(max(limit, 0), 1000)
+        selected = [c for c in columns.split(',') if c] or None
+
+        result = await asyncio.to_thread(_read_dataset_rows, dataset_path, offset, limit, selected)
+        if result is None:
+            raise HTTPException(status_code=400, detail="Dataset format does not support row pagination")
+        total, rows = result
+
+        return ORJSONResponse({"rows": rows, **_page_info(total, offset, rows)})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# HF_TOKEN_FILE is read once at startup; the settings endpoints below are its
+# only writers and update this copy alongside the file
+_TOKEN_CACHE = {"value": HF_TOKEN_FILE.read_text().strip() if HF_TOKEN_FILE.exists() else None}
+
 def get_hf_token():
     """Get HuggingFace token from config file"""
-    if HF_TOKEN_FILE.exists():
-        return HF_TOKEN_FILE.read_text().strip()
-    return None
+    return _TOKEN_CACHE["value"]
+
+@lru_cache(maxsize=4)
+def _hf_api(token):
+    """Get a HuggingFace API client, reused per token"""
+    return HfApi(token=token)
+
+def _search_hf_datasets(token, query, limit):
+    """Query the HF Hub for datasets (blocking)"""
+    datasets = _hf_api(token).list_datasets(
+        search=query if query else None,
+        sort="downloads",
+        limit=limit,
+        full=True
+    )
+
+    result = []
+    for ds in datasets:
+        result.append({
+            "id": ds.id,
+            "name": ds.id.split('/')[-1],
+            "author": ds.author,
+            "downloads": getattr(ds, 'downloads', 0),
+            "likes": getattr(ds, 'likes', 0),
+            "updated": str(getattr(ds, 'lastModified', '')),
+            "tags": getattr(ds, 'tags', [])
+        })
+    return result
 
 @app.get("/api/datasets/hf/search")
 async def search_hf_datasets(query: str = "", limit: int = 20):
     """Search HuggingFace datasets"""
+    if HfApi is None:
+        raise HTTPException(status_code=500, detail="huggingface_hub not installed. Run: pip install huggingface_hub")
     try:
-        from huggingface_hub import HfApi
-
         token = get_hf_token()
-        api = HfApi(token=token)
-        datasets = api.list_datasets(
-            search=query if query else None,
-            sort="downloads",
-            limit=limit,
-            full=True
-        )
+        key = (token, query, limit)
+        cached = _HF_SEARCH_CACHE.get(key)
+        if cached and time.monotonic() - cached[0] < HF_SEARCH_TTL:
+            return ORJSONResponse({"datasets": cached[1]})
 
-        result = []
-        for ds in datasets:
-            result.append({
-                "id": ds.id,
-                "name": ds.id.split('/')[-1],
-                "author": ds.author,
-                "downloads": getattr(ds, 'downloads', 0),
-                "likes": getattr(ds, 'likes', 0),
-                "updated": str(getattr(ds, 'lastModified', '')),
-                "tags": getattr(ds, 'tags', [])
-            })
+        # The HF client does blocking HTTP, also while iterating results
+        result = await asyncio.to_thread(_search_hf_datasets, token, query, limit)
 
-        return {"datasets": result}
-    except ImportError:
-        raise HTTPException(status_code=500, detail="huggingface_hub not installed. Run: pip install huggingface_hub")
+        _HF_SEARCH_CACHE.pop(key, None)
+        _HF_SEARCH_CACHE[key] = (time.monotonic(), result)
+        if len(_HF_SEARCH_CACHE) > HF_SEARCH_CACHE_SIZE:
+            # Dicts keep insertion order, so the first key is the oldest entry
+            _HF_SEARCH_CACHE.pop(next(iter(_HF_SEARCH_CACHE)))
+
+        return ORJSONResponse({"datasets": result})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/datasets/hf/preview/{dataset_id:path}")
 async def preview_hf_dataset(dataset_id: str, limit: int = 5):
     """Preview samples from a HuggingFace dataset"""
+    if load_dataset is None:
+        raise HTTPException(status_code=500, detail="datasets library not installed. Run: pip install datasets")
     try:
-        from datasets import load_dataset
-
         token = get_hf_token()
-        # Load just a few samples
-        dataset = load_dataset(dataset_id, split="train", streaming=True, token=token)
-        samples = []
-
-        for i, item in enumerate(dataset):
-            if i >= limit:
-                break
-            samples.append(item)
+        # Streaming the samples is network I/O, so keep it off the event loop
+        samples = await asyncio.to_thread(_preview_hf_dataset, dataset_id, limit, token)
 
         return {
             "samples": samples,
             "dataset_id": dataset_id
         }
-    except ImportError:
-        raise HTTPException(status_code=500, detail="datasets library not installed. Run: pip install datasets")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _preview_hf_dataset(dataset_id, limit, token):
+    """First rows of a HuggingFace dataset's train split, streamed (blocking)"""
+    if limit <= 0:
+        return []
+    dataset = load_dataset(dataset_id, split="train", streaming=True, token=token)
+    # Decode the sample as one Arrow batch rather than row by row
+    batches = dataset.take(limit).with_format("arrow").iter(batch_size=limit)
+    batch = next(iter(batches), None)
+    return [] if batch is None else batch.to_pylist()
+
 class HFDatasetPull(BaseModel):
     dataset_id: str
     split: str = "train"
@@ -249,9 +671,9 @@ class HFDatasetPull(BaseModel):
 @app.post("/api/datasets/hf/pull")
 async def pull_hf_dataset(pull_request: HFDatasetPull):
     """Pull a dataset from HuggingFace and save locally"""
+    if load_dataset is None:
+        raise HTTPException(status_code=500, detail="datasets library not installed. Run: pip install datasets")
     try:
-        from datasets import load_dataset
-
         token = get_hf_token()
         if not token:
             raise HTTPException(
@@ -259,62 +681,62 @@ async def pull_hf_dataset(pull_request: HFDatasetPull):
                 detail="HuggingFace token required. Please add your token in Settings."
             )
 
-        # Load the dataset
-        dataset = load_dataset(pull_request.dataset_id, split=pull_request.split, token=token)
-
-        # Determine text field
-        text_field = pull_request.text_field
-        if not text_field:
-            # Auto-detect common text fields
-            common_fields = ['text', 'prompt', 'instruction', 'input', 'question', 'content']
-            for field in common_fields:
-                if field in dataset.column_names:
-                    text_field = field
-                    break
+        # Download and export in a worker thread so the event loop keeps serving requests
+        return await asyncio.to_thread(_pull_hf_dataset, pull_request, token)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-            if not text_field:
-                text_field = dataset.column_names[0]  # Use first field as fallback
+def _pull_hf_dataset(pull_request: HFDatasetPull, token: str):
+    """Download a HuggingFace dataset split and save it as JSONL (blocking)"""
+    # Load the dataset
+    dataset = load_dataset(pull_request.dataset_id, split=pull_request.split, token=token)
+
+    # Determine text field
+    text_field = pull_request.text_field
+    if not text_field:
+        # Auto-detect common text fields, using first field as fallback
+        columns = set(dataset.column_names)
+        text_field = next(
+            (field for field in COMMON_TEXT_FIELDS if field in columns),
+            dataset.column_names[0]
+        )
 
-        # Save as JSONL
-        safe_name = pull_request.dataset_id.replace('/', '_').replace('\\', '_')
-        output_path = DATASETS_DIR / f"{safe_name}.jsonl"
+    # Save as JSONL
+    safe_name = pull_request.dataset_id.replace('/', '_').replace('\\', '_')
+    output_path = DATASETS_DIR / f"{safe_name}.jsonl"
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for item in dataset:
-                f.write(json.dumps(item) + '\n')
+    # Export in batches straight from Arrow, without a per-row Python round-trip
+    dataset.to_json(
+        str(output_path),
+        lines=True,
+        batch_size=10_000,
+        num_proc=min(8, os.cpu_count() or 1)
+    )
 
-        return {
-            "success": True,
-            "filename": output_path.name,
-            "path": str(output_path),
-            "rows": len(dataset),
-            "text_field": text_field
-        }
-    except ImportError:
-        raise HTTPException(status_code=500, detail="datasets library not installed. Run: pip install datasets")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "success": True,
+        "filename": output_path.name,
+        "path": str(output_path),
+        "rows": len(dataset),
+        "text_field": text_field
+    }
 
 @app.post("/api/datasets/validate")
 async def validate_dataset_endpoint(file: UploadFile = File(...)):
     """Validate a dataset file before training"""
+    # Save temporarily, hidden from dataset listings
+    temp_path = DATASETS_DIR / f".{uuid.uuid4().hex}_{os.path.basename(file.filename or '')}"
     try:
-        # Save temporarily
-        temp_path = DATASETS_DIR / f"_temp_{file.filename}"
-        with open(temp_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-
-        # Validate
-        result = DatasetValidator.validate_dataset(temp_path)
+        await _write_chunks(_upload_chunks(file), temp_path)
 
-        # Clean up temp file
-        if temp_path.exists():
-            temp_path.unlink()
-
-        return result
+        # Validation reads the whole file, so keep it off the event loop
+        return await asyncio.to_thread(DatasetValidator.validate_dataset, temp_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        temp_path.unlink(missing_ok=True)
 
 @app.get("/api/datasets/{dataset_name}/validate")
 async def validate_existing_dataset(dataset_name: str):
@@ -324,21 +746,25 @@ async def validate_existing_dataset(dataset_name: str):
         if not dataset_path.exists():
             raise HTTPException(status_code=404, detail="Dataset not found")
 
-        result = DatasetValidator.validate_dataset(dataset_path)
+        # Validation reads the whole file, so keep it off the event loop
+        result = await asyncio.to_thread(DatasetValidator.validate_dataset, dataset_path)
 
-        # Save validation result to database
+        # Save validation result to database, committed before the response so a
+        # following listing sees it and a failed write is reported
         if result['valid']:
             stats = result.get('stats', {})
-            db.add_dataset(
+            await asyncio.wrap_future(db.add_dataset(
                 name=dataset_name,
                 path=str(dataset_path),
                 size_bytes=dataset_path.stat().st_size,
                 row_count=stats.get('row_count'),
                 fields=stats.get('fields'),
                 validated=True
-            )
+            ))
 
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -355,14 +781,19 @@ async def start_training(config: TrainingConfig):
             raise HTTPException(status_code=404, detail="Dataset not found")
 
         # Start training in background
-        result = training_manager.start_training(config.dict())
+        result = training_manager.start_training(config.model_dump())
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/training/status")
-async def get_training_status():
-    """Get current training status and progress"""
+async def get_training_status(response: Response):
+    """Get current training status and progress.
+
+    Fallback for clients without the /ws/training socket, which pushes status changes.
+    Live status is never stored by caches, so there is no ETag to revalidate against.
+    """
+    response.headers["Cache-Control"] = "no-store"
     return training_manager.get_status()
 
 @app.post("/api/training/stop")
@@ -379,75 +810,159 @@ async def stop_training():
 
 @app.websocket("/ws/training")
 async def websocket_training_logs(websocket: WebSocket):
-    """WebSocket endpoint for real-time training logs"""
+    """WebSocket endpoint pushing training events (logs, status changes, metrics)"""
     await websocket.accept()
-    try:
+    event_queue = training_manager.subscribe_events()
+
+    async def send_events():
+        # Start from the current status, then push only what changes
+        await websocket.send_text(orjson.dumps(
+            {"events": [{"type": "status", "status": training_manager.get_status()}]}
+        ).decode())
+
+        # Batch whatever queued up during the last send into one message
         while True:
-            # Send training logs/progress updates
-            log_data = training_manager.get_latest_logs()
-            if log_data:
-                await websocket.send_json(log_data)
-            await websocket.receive_text()  # Keep connection alive
+            events = [await event_queue.get()]
+            while not event_queue.empty():
+                events.append(event_queue.get_nowait())
+            await websocket.send_text(orjson.dumps({"events": events}).decode())
+
+    async def receive_messages():
+        # Client messages are only pings; this returns once the client disconnects
+        while True:
+            await websocket.receive_text()
+
+    tasks = [asyncio.create_task(send_events()), asyncio.create_task(receive_messages())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc and not isinstance(exc, WebSocketDisconnect):
+                raise exc
     except WebSocketDisconnect:
         pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        training_manager.unsubscribe_events(event_queue)
 
 
 # ============= MODEL ENDPOINTS =============
 
+def _scan_models(offset=0, limit=None, include_size=True):
+    """Collect stats and database metadata for one page of trained models, sorted by name.
+
+    Returns (total_count, page). Directory sizes are only computed when include_size is set.
+    """
+    global _dir_size_cache_seeded
+    if not _dir_size_cache_seeded:
+        # Sizes persisted by earlier runs of the server
+        for path, (mtime_ns, size) in db.get_model_sizes().items():
+            _DIR_SIZE_CACHE[(path, mtime_ns)] = size
+        _dir_size_cache_seeded = True
+
+    # Get models from database
+    db_models = {m['name']: m for m in db.list_models()}
+
+    model_dirs = sorted(
+        (p for p in MODELS_DIR.iterdir() if p.is_dir() and not p.name.startswith('_')),
+        key=lambda p: p.name
+    )
+    end = None if limit is None else offset + limit
+
+    models = []
+    page_keys = {}
+    for model_dir in model_dirs[offset:end]:
+        stat = model_dir.stat()
+        model_data = {
+            "name": model_dir.name,
+            "created": stat.st_ctime,
+            "path": str(model_dir)
+        }
+
+        if include_size:
+            key = (str(model_dir), stat.st_mtime_ns)
+            page_keys[key[0]] = key
+
+            # Calculate directory size, unless the directory is unchanged since the last scan
+            size = _DIR_SIZE_CACHE.get(key)
+            if size is None:
+                size = _dir_size(model_dir)
+                _DIR_SIZE_CACHE[key] = size
+                db.set_model_size(*key, size)
+            model_data["size"] = size
+
+        # Add database metadata if available
+        if model_dir.name in db_models:
+            db_model = db_models[model_dir.name]
+            model_data.update({
+                "base_model": db_model.get('base_model'),
+                "training_run_id": db_model.get('training_run_id'),
+                "metadata": db_model.get('metadata')
+            })
+
+        models.append(model_data)
+
+    # Drop entries for deleted directories, and superseded entries for modified ones on this page
+    paths = {str(p) for p in model_dirs}
+    stale = [key for key in list(_DIR_SIZE_CACHE)
+             if key[0] not in paths or page_keys.get(key[0], key) != key]
+    for key in stale:
+        _DIR_SIZE_CACHE.pop(key, None)
+    if any(key[0] not in paths for key in stale):
+        db.prune_model_sizes(list(paths))
+    return len(model_dirs), models
+
 @app.get("/api/models/list")
-async def list_models():
-    """List all trained models with metadata"""
-    try:
-        # Get models from database
-        db_models = {m['name']: m for m in db.list_models()}
-
-        models = []
-        for model_dir in MODELS_DIR.iterdir():
-            if model_dir.is_dir() and not model_dir.name.startswith('_'):
-                stat = model_dir.stat()
-
-                # Calculate directory size
-                size = sum(f.stat().st_size for f in model_dir.rglob('*') if f.is_file())
-
-                model_data = {
-                    "name": model_dir.name,
-                    "size": size,
-                    "created": stat.st_ctime,
-                    "path": str(model_dir)
-                }
-
-                # Add database metadata if available
-                if model_dir.name in db_models:
-                    db_model = db_models[model_dir.name]
-                    model_data.update({
-                        "base_model": db_model.get('base_model'),
-                        "training_run_id": db_model.get('training_run_id'),
-                        "metadata": db_model.get('metadata')
-                    })
-
-                models.append(model_data)
-
-        return {"models": models}
+async def list_models(request: Request, offset: int = 0, limit: Optional[int] = None,
+                      include_size: bool = True):
+    """List trained models with metadata, a page at a time; all of them unless limit is given"""
+    try:
+        offset, limit = max(offset, 0), None if limit is None else max(limit, 0)
+
+        # Scan in a worker thread so disk I/O doesn't block the event loop
+        total, models = await asyncio.to_thread(_scan_models, offset, limit, include_size)
+
+        # Keyed on the payload, since model metadata lives in the database too
+        payload = {"models": models, **_page_info(total, offset, models)}
+        etag = _payload_etag(payload)
+        return _not_modified(request, etag) or ORJSONResponse(payload, headers={"ETag": etag})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Model names end up in container paths, so keep them to a safe, flat charset
+MODEL_NAME_RE = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+QUANTIZATION_RE = re.compile(r"^[A-Za-z0-9_]{1,32}$")
+
+def _resolve_model_path(model_name: str) -> Path:
+    """Validate a model name and return its directory, rejecting bad names before any container work"""
+    if not MODEL_NAME_RE.match(model_name) or model_name in (".", ".."):
+        raise HTTPException(status_code=400, detail="Invalid model name")
+
+    model_path = (MODELS_DIR / model_name).resolve()
+    if not model_path.is_relative_to(MODELS_DIR.resolve()):
+        raise HTTPException(status_code=400, detail="Invalid model name")
+    if not model_path.exists():
+        raise HTTPException(status_code=404, detail="Model not found")
+    return model_path
+
 @app.delete("/api/models/{model_name}")
 async def delete_model(model_name: str):
     """Delete a trained model"""
     try:
         import shutil
 
-        model_path = MODELS_DIR / model_name
-        if not model_path.exists():
-            raise HTTPException(status_code=404, detail="Model not found")
+        model_path = _resolve_model_path(model_name)
 
         # Delete from filesystem
-        shutil.rmtree(model_path)
+        await asyncio.to_thread(shutil.rmtree, model_path)
 
         # Delete from database
-        db.delete_model(model_name)
+        await asyncio.wrap_future(db.delete_model(model_name))
 
         return {"success": True, "message": f"Model '{model_name}' deleted"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -455,9 +970,7 @@ async def delete_model(model_name: str):
 async def export_model_info(model_name: str):
     """Get model export options"""
     try:
-        model_path = MODELS_DIR / model_name
-        if not model_path.exists():
-            raise HTTPException(status_code=404, detail="Model not found")
+        model_path = _resolve_model_path(model_name)
 
         return {
             "name": model_name,
@@ -465,6 +978,8 @@ async def export_model_info(model_name: str):
             "export_formats": ["gguf", "ollama"],
             "note": "GGUF and Ollama export available"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -472,128 +987,57 @@ class ExportRequest(BaseModel):
     format: str
     quantization: str = "q4_k_m"  # For GGUF: q4_k_m, q5_k_m, q8_0, etc.
 
+async def _running_container_id():
+    """ID of the running Unsloth container, or a 503 when there isn't one"""
+    container = await asyncio.to_thread(docker_manager.get_running_container)
+    if container is None:
+        raise HTTPException(status_code=503, detail="Docker container not running. Please start the container first.")
+    return container["Id"]
+
+async def _prepare_export(model_name: str, format: str, request: ExportRequest):
+    """Validate an export request and pick its container, script and script environment"""
+    _resolve_model_path(model_name)
+
+    export_format = format.lower()
+    if export_format not in ("gguf", "ollama"):
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    if not QUANTIZATION_RE.match(request.quantization):
+        raise HTTPException(status_code=400, detail="Invalid quantization method")
+
+    container_id = await _running_container_id()
+
+    if export_format == "gguf":
+        output_file = f"{model_name}.{request.quantization}.gguf"
+        export_script = GGUF_EXPORT_SCRIPT
+    else:
+        # Ollama: saves as GGUF then creates a Modelfile
+        output_file = f"{model_name}.Q4_K_M.gguf"
+        export_script = OLLAMA_EXPORT_SCRIPT
+
+    environment = {
+        "MODEL_PATH": f"/workspace/work/models/{model_name}",
+        "OUTPUT_PATH": f"/workspace/work/models/{output_file}",
+        "QUANTIZATION": request.quantization,
+        "MODELFILE_NAME": model_name,
+    }
+    return container_id, output_file, export_script, environment
+
 @app.post("/api/models/{model_name}/export/{format}")
 async def export_model(model_name: str, format: str, request: ExportRequest):
     """Export a model to GGUF or Ollama format"""
     try:
-        model_path = MODELS_DIR / model_name
-        if not model_path.exists():
-            raise HTTPException(status_code=404, detail="Model not found")
-
-        # Check if container is running
-        containers = docker_manager.docker_client.containers.list(
-            filters={"ancestor": "unsloth/unsloth", "status": "running"}
+        container_id, output_file, export_script, environment = await _prepare_export(
+            model_name, format, request
         )
 
-        if not containers:
-            raise HTTPException(status_code=503, detail="Docker container not running. Please start the container first.")
-
-        container = containers[0]
-
-        if format.lower() == "gguf":
-            # Generate GGUF export script
-            output_file = f"{model_name}.{request.quantization}.gguf"
-            export_script = f'''
-import sys
-from unsloth import FastLanguageModel
-
-try:
-    print("Loading model for GGUF export...")
-    model, tokenizer = FastLanguageModel.from_pretrained(
-        model_name="/workspace/work/models/{model_name}",
-        max_seq_length=2048,
-        dtype=None,
-        load_in_4bit=True,
-    )
-
-    print("Exporting to GGUF format (quantization: {request.quantization})...")
-    model.save_pretrained_gguf(
-        "/workspace/work/models/{output_file}",
-        tokenizer,
-        quantization_method="{request.quantization}"
-    )
-
-    print("EXPORT_SUCCESS")
-    print(f"Model exported to: /workspace/work/models/{output_file}")
-
-except Exception as e:
-    print(f"ERROR: {{str(e)}}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
-'''
-
-        elif format.lower() == "ollama":
-            # Generate Ollama export script (saves as GGUF then creates Modelfile)
-            output_file = f"{model_name}.Q4_K_M.gguf"
-            modelfile_name = model_name.replace('/', '_').replace(' ', '_')
-
-            export_script = f'''
-import sys
-from unsloth import FastLanguageModel
-
-try:
-    print("Loading model for Ollama export...")
-    model, tokenizer = FastLanguageModel.from_pretrained(
-        model_name="/workspace/work/models/{model_name}",
-        max_seq_length=2048,
-        dtype=None,
-        load_in_4bit=True,
-    )
-
-    print("Exporting to GGUF format for Ollama...")
-    model.save_pretrained_gguf(
-        "/workspace/work/models/{output_file}",
-        tokenizer,
-        quantization_method="q4_k_m"
-    )
-
-    # Create Modelfile for Ollama
-    modelfile_content = f"""FROM /workspace/work/models/{output_file}
-PARAMETER temperature 0.7
-PARAMETER top_p 0.9
-PARAMETER stop "<|im_end|>"
-"""
-
-    with open("/workspace/work/models/Modelfile.{modelfile_name}", "w") as f:
-        f.write(modelfile_content)
-
-    print("EXPORT_SUCCESS")
-    print(f"Model exported to: /workspace/work/models/{output_file}")
-    print(f"Modelfile created: Modelfile.{modelfile_name}")
-    print("")
-    print("To use with Ollama, run:")
-    print(f"  ollama create {modelfile_name} -f work/models/Modelfile.{modelfile_name}")
-
-except Exception as e:
-    print(f"ERROR: {{str(e)}}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
-'''
-
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
-
-        # Save export script
-        script_path = Path(__file__).parent.parent / "work" / "export_script.py"
-        script_path.write_text(export_script)
-
-        # Execute in container
-        exec_result = container.exec_run(
-            ["python", "/workspace/work/export_script.py"],
-            demux=True
+        # Pipe the script into the container, off the event loop since exports can take minutes
+        _, stdout, stderr = await asyncio.to_thread(
+            docker_manager.run_python_script, container_id, export_script, environment
         )
 
         # Parse output
-        output = ""
-        error = ""
-        if exec_result.output:
-            for stdout_chunk, stderr_chunk in exec_result.output:
-                if stdout_chunk:
-                    output += stdout_chunk.decode('utf-8')
-                if stderr_chunk:
-                    error += stderr_chunk.decode('utf-8')
+        output = stdout.decode('utf-8', errors='replace')
+        error = stderr.decode('utf-8', errors='replace')
 
         # Check if export was successful
         if "EXPORT_SUCCESS" in output:
@@ -617,6 +1061,36 @@ except Exception as e:
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/models/{model_name}/export/{format}/stream")
+async def export_model_stream(model_name: str, format: str, request: ExportRequest):
+    """Export a model, streaming the export log as plain text while it runs"""
+    container_id, _, export_script, environment = await _prepare_export(model_name, format, request)
+
+    # Starlette iterates the blocking generator in its threadpool
+    return StreamingResponse(
+        docker_manager.stream_python_script(container_id, export_script, environment),
+        media_type="text/plain"
+    )
+
+@app.get("/api/models/{model_name}/download/{filename}")
+async def download_model_file(model_name: str, filename: str):
+    """Download a model's exported file (GGUF, Modelfile) or a file from its directory"""
+    _resolve_model_path(model_name)
+    if not MODEL_NAME_RE.match(filename) or filename in (".", ".."):
+        raise HTTPException(status_code=400, detail="Invalid file name")
+
+    # Exports sit next to the model directory, named after the model
+    if filename.startswith(f"{model_name}.") or filename == f"Modelfile.{model_name}":
+        file_path = MODELS_DIR / filename
+    else:
+        file_path = MODELS_DIR / model_name / filename
+
+    if not file_path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+
+    # FileResponse streams from disk (sendfile where available) instead of buffering the file
+    return FileResponse(file_path, media_type="application/octet-stream", filename=filename)
+
 class InferenceRequest(BaseModel):
     prompt: str
     max_tokens: int = 100
@@ -626,89 +1100,38 @@ class InferenceRequest(BaseModel):
 async def run_inference(model_name: str, request: InferenceRequest):
     """Run inference with a trained model"""
     try:
-        model_path = MODELS_DIR / model_name
-        if not model_path.exists():
-            raise HTTPException(status_code=404, detail="Model not found")
-
-        # Check if container is running
-        containers = docker_manager.docker_client.containers.list(
-            filters={"ancestor": "unsloth/unsloth", "status": "running"}
-        )
-
-        if not containers:
-            raise HTTPException(status_code=503, detail="Docker container not running. Please start the container first.")
-
-        container = containers[0]
-
-        # Generate inference script
-        inference_script = f'''
-import sys
-import torch
-from unsloth import FastLanguageModel
-
-try:
-    print("Loading model...")
-    model, tokenizer = FastLanguageModel.from_pretrained(
-        model_name="/workspace/work/models/{model_name}",
-        max_seq_length=2048,
-        dtype=None,
-        load_in_4bit=True,
-    )
-
-    FastLanguageModel.for_inference(model)
-
-    print("Running inference...")
-    inputs = tokenizer(["""{request.prompt}"""], return_tensors="pt").to("cuda")
-
-    outputs = model.generate(
-        **inputs,
-        max_new_tokens={request.max_tokens},
-        temperature={request.temperature},
-        use_cache=True
-    )
-
-    result = tokenizer.batch_decode(outputs)[0]
-    print("RESULT_START")
-    print(result)
-    print("RESULT_END")
-
-except Exception as e:
-    print(f"ERROR: {{str(e)}}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
-'''
-
-        # Save script to work directory
-        script_path = Path(__file__).parent.parent / "work" / "inference_script.py"
-        script_path.write_text(inference_script)
-
-        # Execute in container
-        exec_result = container.exec_run(
-            ["python", "/workspace/work/inference_script.py"],
-            demux=True
+        model_path = _resolve_model_path(model_name)
+
+        if not 1 <= request.max_tokens <= 8192:
+            raise HTTPException(status_code=400, detail="max_tokens must be between 1 and 8192")
+        if not 0.0 <= request.temperature <= 2.0:
+            raise HTTPException(status_code=400, detail="temperature must be between 0 and 2")
+
+        container_id = await _running_container_id()
+
+        # Served by the container's warm inference server, so only the first request
+        # for a model pays the load; the directory mtime keys out stale weights
+        reply = await asyncio.to_thread(
+            docker_manager.run_inference,
+            container_id,
+            f"/workspace/work/models/{model_name}",
+            request.prompt,
+            request.max_tokens,
+            request.temperature,
+            model_path.stat().st_mtime_ns
         )
 
-        # Parse output
-        output = ""
-        if exec_result.output:
-            for stdout_chunk, stderr_chunk in exec_result.output:
-                if stdout_chunk:
-                    output += stdout_chunk.decode('utf-8')
-
-        # Extract result
-        if "RESULT_START" in output and "RESULT_END" in output:
-            result_text = output.split("RESULT_START")[1].split("RESULT_END")[0].strip()
+        if "result" in reply:
             return {
                 "success": True,
-                "result": result_text,
+                "result": reply["result"].strip(),
                 "prompt": request.prompt
             }
         else:
             return {
                 "success": False,
                 "error": "Failed to generate output",
-                "output": output
+                "output": reply.get("error", "")
             }
 
     except HTTPException:
@@ -723,7 +1146,8 @@ except Exception as e:
 async def get_system_resources():
     """Get current system resource usage"""
     try:
-        return resource_monitor.get_system_resources()
+        # Waits on the GPU/disk probe futures, so keep it off the event loop
+        return await asyncio.to_thread(resource_monitor.get_system_resources)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -731,7 +1155,8 @@ async def get_system_resources():
 async def get_container_stats():
     """Get Docker container resource stats"""
     try:
-        stats = resource_monitor.get_container_stats()
+        # The first call waits on the Docker stats stream
+        stats = await asyncio.to_thread(resource_monitor.get_container_stats)
         if stats is None:
             return {"error": "No running container"}
         return stats
@@ -753,7 +1178,8 @@ async def check_resources(dataset_size_mb: float, model_size_gb: float = 8.0):
 async def get_training_history(limit: int = 50):
     """Get training run history"""
     try:
-        return {"runs": db.list_training_runs(limit)}
+        runs = await asyncio.to_thread(db.list_training_runs, limit)
+        return {"runs": runs}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -761,17 +1187,19 @@ async def get_training_history(limit: int = 50):
 async def get_training_run_details(run_id: int):
     """Get detailed information about a training run"""
     try:
-        run = db.get_training_run(run_id)
+        run = await asyncio.to_thread(db.get_training_run, run_id)
         if not run:
             raise HTTPException(status_code=404, detail="Training run not found")
 
         # Get metrics
-        metrics = db.get_training_metrics(run_id)
+        metrics = await asyncio.to_thread(db.get_training_metrics, run_id)
 
         return {
             "run": run,
             "metrics": metrics
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -787,26 +1215,24 @@ async def health_check():
 async def check_container_health():
     """Check if Docker container is healthy"""
     try:
-        containers = docker_manager.docker_client.containers.list(
-            filters={"ancestor": "unsloth/unsloth", "status": "running"}
-        )
+        container = await asyncio.to_thread(docker_manager.get_running_container)
 
-        if not containers:
+        if container is None:
             return {
                 "healthy": False,
                 "message": "No running container"
             }
 
-        container = containers[0]
-
         # Test if Unsloth is importable
-        result = container.exec_run(["python", "-c", "import unsloth; print('OK')"])
+        exit_code, stdout, _ = await asyncio.to_thread(
+            docker_manager.run_python_script, container["Id"], "import unsloth; print('OK')"
+        )
 
         return {
-            "healthy": result.exit_code == 0,
-            "container_id": container.short_id,
-            "container_name": container.name,
-            "message": result.output.decode('utf-8').strip() if result.exit_code == 0 else "Unsloth import failed"
+            "healthy": exit_code == 0,
+            "container_id": container["Id"][:12],
+            "container_name": container["Names"][0].lstrip("/"),
+            "message": stdout.decode('utf-8').strip() if exit_code == 0 else "Unsloth import failed"
         }
     except Exception as e:
         return {
@@ -818,13 +1244,10 @@ async def check_container_health():
 # ============= SETTINGS ENDPOINTS =============
 
 @app.get("/api/settings/hf-token")
-async def get_hf_token():
+async def get_hf_token_setting():
     """Get stored Hugging Face token"""
     try:
-        if HF_TOKEN_FILE.exists():
-            token = HF_TOKEN_FILE.read_text().strip()
-            return {"token": token}
-        return {"token": None}
+        return {"token": get_hf_token()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -833,6 +1256,7 @@ async def save_hf_token(token_data: HFToken):
     """Save Hugging Face token"""
     try:
         HF_TOKEN_FILE.write_text(token_data.token)
+        _TOKEN_CACHE["value"] = token_data.token.strip()
         return {"success": True, "message": "Token saved successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -843,6 +1267,7 @@ async def delete_hf_token():
     try:
         if HF_TOKEN_FILE.exists():
             HF_TOKEN_FILE.unlink()
+        _TOKEN_CACHE["value"] = None
         return {"success": True, "message": "Token deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -854,7 +1279,10 @@ if __name__ == "__main__":
 
     # Fix Windows console encoding
     if sys.platform == 'win32':
-        os.system('chcp 65001 > nul')
+        import ctypes
+        # Same as `chcp 65001`, without spawning cmd.exe
+        ctypes.windll.kernel32.SetConsoleOutputCP(65001)
+        ctypes.windll.kernel32.SetConsoleCP(65001)
 
     try:
         print("🦥⚔️ Starting Slothbuckler Backend...")
@@ -867,9 +1295,17 @@ if __name__ == "__main__":
         print(f"API will be available at: http://localhost:8000")
         print(f"API docs at: http://localhost:8000/docs")
 
+    # Training, container start and the database writer keep state in this process,
+    # so extra workers are opt-in via WEB_CONCURRENCY
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
     uvicorn.run(
-        app,
+        "main:app" if workers > 1 else app,
         host="0.0.0.0",
         port=8000,
+        workers=workers,
+        loop="asyncio" if sys.platform == 'win32' else "uvloop",
+        http="httptools",
+        limit_concurrency=1000,
+        timeout_keep_alive=30,
         log_level="info"
     )
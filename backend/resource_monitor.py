@@ -1,26 +1,182 @@
-import docker
-import psutil
+from functools import lru_cache
 import logging
+import os
+import threading
+import time
 from typing import Dict, Optional
 from pathlib import Path
+from runtime import docker_client, shared_pool
+
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
 
 logger = logging.getLogger(__name__)
 
+UNSLOTH_IMAGE = "unsloth/unsloth"
+
+# Byte-to-unit multipliers for the reported sizes
+_GB = 1.0 / (1024**3)
+_MB = 1.0 / (1024**2)
+
+# Disk usage is reported for the volume holding the work directory
+_WORK_DIR = str(Path(__file__).resolve().parent.parent / "work")
+
+# Seconds to wait before resubscribing after the Docker event stream drops
+EVENTS_RETRY_DELAY = 5.0
+
+# The first CPU reading samples over this long; later ones are non-blocking
+CPU_FIRST_SAMPLE_INTERVAL = 0.1  # seconds
+
+# psutil readings taken closer together than ~0.1s are noisy, so CPU usage is
+# resampled at most this often and shared by every caller in between
+CPU_SAMPLE_TTL = 0.5  # seconds
+
+
+@lru_cache(maxsize=None)
+def _psutil():
+    """Import psutil on first use rather than when the backend starts"""
+    import psutil
+    return psutil
+
 class ResourceMonitor:
     """Monitor system resources (GPU, RAM, disk)"""
 
     def __init__(self, docker_client=None):
-        self.docker_client = docker_client or docker.from_env()
+        # Nothing touches Docker, psutil or NVML until the first poll that needs it
+        self._docker_client = docker_client
+        self._docker_lock = threading.Lock()
+        self._cpu_count = None  # constant for the life of the process once read
+        self._cpu_lock = threading.Lock()
+        self._cpu_sample = None  # (monotonic timestamp, aggregate percent, per-CPU percents)
+        self._pool = shared_pool()
+
+        # Polls arriving within a TTL get the previous result; the locks are held while
+        # refreshing so concurrent polls wait for one refresh instead of each running their own
+        self._cache = None
+        self._cache_ts = 0.0
+        self._cache_ttl = 1.0  # seconds
+        self._cache_lock = threading.Lock()
+        self._gpu_cache = None
+        self._gpu_cache_ts = 0.0
+        self._gpu_cache_ttl = 2.0  # seconds; the GPU probe execs into the container
+        self._gpu_cache_lock = threading.Lock()
+
+        # Each running container gets one long-lived stats stream; polls read its latest frame
+        self._stats_threads: Dict[str, threading.Thread] = {}
+        self._latest_stats: Dict[str, dict] = {}
+        self._first_stats: Dict[str, threading.Event] = {}
+        self._stats_lock = threading.Lock()
+
+        # The running Unsloth container, kept current from Docker's event stream
+        # so polls never have to list containers
+        self._unsloth_container = None
+        self._container_lock = threading.RLock()
+        self._watching = False
+
+        # NVML reads GPU counters in-process; nvidia-smi in the container is the fallback
+        self._nvml_handles = None
+        self._nvml_lock = threading.Lock()
+
+    @property
+    def docker_client(self):
+        """Docker client, connected on first use"""
+        with self._docker_lock:
+            if self._docker_client is None:
+                self._docker_client = docker_client()
+            return self._docker_client
+
+    def _subscribe_and_seed(self):
+        """Open the container event stream and record the currently running container"""
+        # Subscribe before listing, so a change between the two is not missed
+        events = self.docker_client.events(
+            decode=True,
+            filters={"type": "container", "event": ["start", "die", "destroy"]}
+        )
+        running = self.docker_client.containers.list(
+            filters={"ancestor": UNSLOTH_IMAGE, "status": "running"}
+        )
+        with self._container_lock:
+            self._unsloth_container = running[0] if running else None
+        return events
+
+    def _watch_containers(self, events):
+        """Track the running Unsloth container through start/die/destroy events"""
+        while True:
+            try:
+                if events is None:
+                    events = self._subscribe_and_seed()
+                for event in events:
+                    self._apply_container_event(event)
+            except Exception as e:
+                logger.warning(f"Docker event stream interrupted: {e}")
+            events = None
+            time.sleep(EVENTS_RETRY_DELAY)
+
+    def _apply_container_event(self, event: Dict):
+        """Update the tracked container from one Docker event"""
+        action = event.get("Action") or event.get("status")
+        container_id = event.get("id") or event.get("Actor", {}).get("ID")
+
+        if action == "start":
+            image = event.get("Actor", {}).get("Attributes", {}).get("image", "")
+            if image == UNSLOTH_IMAGE or image.startswith(UNSLOTH_IMAGE + ":"):
+                container = self.docker_client.containers.get(container_id)
+                with self._container_lock:
+                    self._unsloth_container = container
+        else:
+            with self._container_lock:
+                if self._unsloth_container is not None and self._unsloth_container.id == container_id:
+                    self._unsloth_container = None
+
+    def _get_container(self):
+        """The running Unsloth container, or None"""
+        with self._container_lock:
+            if not self._watching:
+                # Seed synchronously so this first caller already gets an answer
+                events = self._subscribe_and_seed()
+                threading.Thread(target=self._watch_containers, args=(events,), daemon=True).start()
+                self._watching = True
+            return self._unsloth_container
+
+    def _get_nvml_handles(self):
+        """NVML handles for the host's GPUs, initialized on first use"""
+        with self._nvml_lock:
+            if self._nvml_handles is None:
+                self._nvml_handles = self._init_nvml()
+            return self._nvml_handles
+
+    def _init_nvml(self):
+        """Get NVML handles for the host's GPUs, or an empty list if NVML is unavailable"""
+        if pynvml is None:
+            return []
+        try:
+            pynvml.nvmlInit()
+            return [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())]
+        except pynvml.NVMLError as e:
+            logger.info(f"NVML unavailable, using nvidia-smi in the container for GPU stats: {e}")
+            return []
 
     def get_system_resources(self) -> Dict:
-        """Get current system resource usage"""
+        """Get current system resource usage, reusing a result less than a second old"""
+        with self._cache_lock:
+            if self._cache is not None and time.monotonic() - self._cache_ts < self._cache_ttl:
+                return self._cache
+            self._cache = self._collect_system_resources()
+            self._cache_ts = time.monotonic()
+            return self._cache
+
+    def _collect_system_resources(self) -> Dict:
+        """Probe every subsystem in parallel, so the total takes as long as the slowest probe"""
         try:
-            return {
-                "cpu": self._get_cpu_usage(),
-                "ram": self._get_ram_usage(),
-                "disk": self._get_disk_usage(),
-                "gpu": self._get_gpu_usage()
+            futures = {
+                "cpu": self._pool.submit(self._get_cpu_usage),
+                "ram": self._pool.submit(self._get_ram_usage),
+                "disk": self._pool.submit(self._get_disk_usage),
+                "gpu": self._pool.submit(self._get_gpu_usage)
             }
+            return {key: future.result() for key, future in futures.items()}
         except Exception as e:
             logger.error(f"Error getting system resources: {e}")
             return {
@@ -33,10 +189,29 @@ class ResourceMonitor:
     def _get_cpu_usage(self) -> Dict:
         """Get CPU usage"""
         try:
+            psutil = _psutil()
+            with self._cpu_lock:
+                if self._cpu_count is None:
+                    # Prime psutil's last-sample state with one short sample; from then on
+                    # non-blocking calls return the average since the previous poll
+                    psutil.cpu_percent(interval=None)
+                    psutil.cpu_percent(interval=None, percpu=True)
+                    time.sleep(CPU_FIRST_SAMPLE_INTERVAL)
+                    self._cpu_count = psutil.cpu_count()
+
+                now = time.monotonic()
+                if self._cpu_sample is None or now - self._cpu_sample[0] >= CPU_SAMPLE_TTL:
+                    self._cpu_sample = (
+                        now,
+                        psutil.cpu_percent(interval=None),
+                        psutil.cpu_percent(interval=None, percpu=True)
+                    )
+                _, percent, per_cpu = self._cpu_sample
+
             return {
-                "percent": psutil.cpu_percent(interval=1),
-                "count": psutil.cpu_count(),
-                "per_cpu": psutil.cpu_percent(interval=1, percpu=True)
+                "percent": percent,
+                "count": self._cpu_count,
+                "per_cpu": per_cpu
             }
         except Exception as e:
             return {"error": str(e)}
@@ -44,11 +219,11 @@ class ResourceMonitor:
     def _get_ram_usage(self) -> Dict:
         """Get RAM usage"""
         try:
-            mem = psutil.virtual_memory()
+            mem = _psutil().virtual_memory()
             return {
-                "total_gb": round(mem.total / (1024**3), 2),
-                "used_gb": round(mem.used / (1024**3), 2),
-                "available_gb": round(mem.available / (1024**3), 2),
+                "total_gb": round(mem.total * _GB, 2),
+                "used_gb": round(mem.used * _GB, 2),
+                "available_gb": round(mem.available * _GB, 2),
                 "percent": mem.percent
             }
         except Exception as e:
@@ -57,34 +232,81 @@ class ResourceMonitor:
     def _get_disk_usage(self) -> Dict:
         """Get disk usage for work directory"""
         try:
-            work_dir = Path(__file__).parent.parent / "work"
-            disk = psutil.disk_usage(str(work_dir))
+            if not hasattr(os, "statvfs"):
+                # Windows has no statvfs, so let psutil do the platform call
+                disk = _psutil().disk_usage(_WORK_DIR)
+                total, used, free, percent = disk.total, disk.used, disk.free, disk.percent
+            else:
+                # One syscall, counted the way psutil does: blocks reserved
+                # for root are neither used nor free for us
+                st = os.statvfs(_WORK_DIR)
+                total = st.f_blocks * st.f_frsize
+                free = st.f_bavail * st.f_frsize
+                used = (st.f_blocks - st.f_bfree) * st.f_frsize
+                usable = used + free
+                percent = round(used / usable * 100, 1) if usable else 0.0
 
             return {
-                "total_gb": round(disk.total / (1024**3), 2),
-                "used_gb": round(disk.used / (1024**3), 2),
-                "free_gb": round(disk.free / (1024**3), 2),
-                "percent": disk.percent
+                "total_gb": round(total * _GB, 2),
+                "used_gb": round(used * _GB, 2),
+                "free_gb": round(free * _GB, 2),
+                "percent": percent
             }
         except Exception as e:
             return {"error": str(e)}
 
     def _get_gpu_usage(self) -> Dict:
+        """Get GPU usage, reusing a result less than two seconds old"""
+        with self._gpu_cache_lock:
+            if self._gpu_cache is not None and time.monotonic() - self._gpu_cache_ts < self._gpu_cache_ttl:
+                return self._gpu_cache
+            self._gpu_cache = self._query_gpu_usage()
+            self._gpu_cache_ts = time.monotonic()
+            return self._gpu_cache
+
+    def _query_gpu_usage(self) -> Dict:
+        """Get GPU usage through NVML when available, otherwise from the Docker container"""
+        if self._get_nvml_handles():
+            return self._query_nvml()
+        return self._query_nvidia_smi()
+
+    def _query_nvml(self) -> Dict:
+        """Get GPU usage for the first GPU from NVML"""
+        try:
+            handle = self._nvml_handles[0]
+            name = pynvml.nvmlDeviceGetName(handle)
+            util = pynvml.nvmlDeviceGetUtilizationRates(handle)
+            mem = pynvml.nvmlDeviceGetMemoryInfo(handle)
+
+            return {
+                "available": True,
+                "index": 0,
+                "name": name.decode('utf-8') if isinstance(name, bytes) else name,
+                "temperature_c": pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU),
+                "utilization_percent": util.gpu,
+                "memory_utilization_percent": util.memory,
+                "memory_total_mb": mem.total // (1024**2),
+                "memory_used_mb": mem.used // (1024**2),
+                "memory_free_mb": mem.free // (1024**2)
+            }
+        except pynvml.NVMLError as e:
+            logger.error(f"Error getting GPU usage from NVML: {e}")
+            return {
+                "available": False,
+                "error": str(e)
+            }
+
+    def _query_nvidia_smi(self) -> Dict:
         """Get GPU usage from Docker container"""
         try:
-            # Find running Unsloth container
-            containers = self.docker_client.containers.list(
-                filters={"ancestor": "unsloth/unsloth", "status": "running"}
-            )
+            container = self._get_container()
 
-            if not containers:
+            if container is None:
                 return {
                     "available": False,
                     "message": "No running container"
                 }
 
-            container = containers[0]
-
             # Run nvidia-smi inside container to get GPU stats
             result = container.exec_run([
                 "nvidia-smi",
@@ -106,19 +328,20 @@ class ResourceMonitor:
                     "message": "No GPU data"
                 }
 
-            # Parse CSV: index,name,temp,util,mem_util,mem_total,mem_used,mem_free
-            parts = output.split(',')
-            if len(parts) >= 8:
+            # Parse CSV for the first GPU: index,name,temp,util,mem_util,mem_total,mem_used,mem_free
+            parts = [p.strip() for p in output.split('\n', 1)[0].split(',', 7)]
+            if len(parts) == 8:
+                temp, util, mem_util, mem_total, mem_used, mem_free = [int(p) if p else 0 for p in parts[2:]]
                 return {
                     "available": True,
-                    "index": int(parts[0].strip()),
-                    "name": parts[1].strip(),
-                    "temperature_c": int(parts[2].strip()) if parts[2].strip() else 0,
-                    "utilization_percent": int(parts[3].strip()) if parts[3].strip() else 0,
-                    "memory_utilization_percent": int(parts[4].strip()) if parts[4].strip() else 0,
-                    "memory_total_mb": int(parts[5].strip()) if parts[5].strip() else 0,
-                    "memory_used_mb": int(parts[6].strip()) if parts[6].strip() else 0,
-                    "memory_free_mb": int(parts[7].strip()) if parts[7].strip() else 0
+                    "index": int(parts[0]),
+                    "name": parts[1],
+                    "temperature_c": temp,
+                    "utilization_percent": util,
+                    "memory_utilization_percent": mem_util,
+                    "memory_total_mb": mem_total,
+                    "memory_used_mb": mem_used,
+                    "memory_free_mb": mem_free
                 }
 
             return {
@@ -136,21 +359,19 @@ class ResourceMonitor:
     def get_container_stats(self) -> Optional[Dict]:
         """Get Docker container resource usage"""
         try:
-            containers = self.docker_client.containers.list(
-                filters={"ancestor": "unsloth/unsloth", "status": "running"}
-            )
-
-            if not containers:
+            container = self._get_container()
+            if container is None:
                 return None
 
-            container = containers[0]
-            stats = container.stats(stream=False)
+            stats = self._stream_stats(container)
+            if stats is None:
+                return None
 
             # Parse Docker stats
             cpu_delta = stats['cpu_stats']['cpu_usage']['total_usage'] - \
                        stats['precpu_stats']['cpu_usage']['total_usage']
-            system_delta = stats['cpu_stats']['system_cpu_usage'] - \
-                          stats['precpu_stats']['system_cpu_usage']
+            system_delta = stats['cpu_stats'].get('system_cpu_usage', 0) - \
+                          stats['precpu_stats'].get('system_cpu_usage', 0)
             cpu_percent = 0.0
             if system_delta > 0:
                 cpu_percent = (cpu_delta / system_delta) * 100.0
@@ -163,8 +384,8 @@ class ResourceMonitor:
                 "container_id": container.short_id,
                 "container_name": container.name,
                 "cpu_percent": round(cpu_percent, 2),
-                "memory_usage_mb": round(memory_usage / (1024**2), 2),
-                "memory_limit_mb": round(memory_limit / (1024**2), 2),
+                "memory_usage_mb": round(memory_usage * _MB, 2),
+                "memory_limit_mb": round(memory_limit * _MB, 2),
                 "memory_percent": round(memory_percent, 2)
             }
 
@@ -172,6 +393,43 @@ class ResourceMonitor:
             logger.error(f"Error getting container stats: {e}")
             return None
 
+    def _stream_stats(self, container, first_frame_timeout: float = 3.0) -> Optional[dict]:
+        """Latest stats frame for a container, starting its stats stream on first use.
+
+        Docker needs two samples for a CPU delta, so only the very first call waits
+        for a frame; afterwards the frame already in memory is returned.
+        """
+        with self._stats_lock:
+            if container.id not in self._stats_threads:
+                self._first_stats[container.id] = threading.Event()
+                thread = threading.Thread(
+                    target=self._stats_reader, args=(container,), daemon=True
+                )
+                self._stats_threads[container.id] = thread
+                thread.start()
+            first = self._first_stats.get(container.id)
+
+        if first is not None:
+            first.wait(first_frame_timeout)
+        return self._latest_stats.get(container.id)
+
+    def _stats_reader(self, container):
+        """Keep the latest stats frame for a container until its stream ends"""
+        try:
+            for frame in container.stats(stream=True, decode=True):
+                self._latest_stats[container.id] = frame
+                self._first_stats[container.id].set()
+        except Exception as e:
+            logger.debug(f"Stats stream for {container.short_id} ended: {e}")
+        finally:
+            # The stream closes when the container stops; the next poll starts a fresh one
+            with self._stats_lock:
+                self._stats_threads.pop(container.id, None)
+                self._latest_stats.pop(container.id, None)
+                first = self._first_stats.pop(container.id, None)
+            if first is not None:
+                first.set()
+
     def check_resources_adequate(self, dataset_size_mb: float, model_size_gb: float = 8.0) -> Dict:
         """
         Check if system has adequate resources for training
@@ -0,0 +1,28 @@
+"""Process-wide resources shared by the backend's managers.
+
+DockerManager, TrainingManager and ResourceMonitor all talk to the same daemon,
+so they share one Docker client (and its connection pool) and one I/O thread
+pool, each created on first use.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+# Keep-alive connections kept per Docker API connection pool, so concurrent
+# UI polls reuse sockets instead of reconnecting to the daemon
+DOCKER_POOL_SIZE = 16
+
+# Workers in the shared pool for blocking probes and Docker calls
+IO_POOL_WORKERS = 8
+
+
+@lru_cache(maxsize=None)
+def docker_client():
+    """The process's Docker client; raises DockerException if the daemon is unreachable"""
+    import docker
+    return docker.from_env(max_pool_size=DOCKER_POOL_SIZE)
+
+
+@lru_cache(maxsize=None)
+def shared_pool():
+    """The process's thread pool for blocking I/O"""
+    return ThreadPoolExecutor(max_workers=IO_POOL_WORKERS, thread_name_prefix="unsloth-io")
@@ -0,0 +1,114 @@
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import Database
+
+
+class DatabaseTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db = Database(Path(tmp.name) / "test.db")
+        self.addCleanup(self.db.close)
+
+    def create_run(self, model_name="model"):
+        return self.db.create_training_run(
+            model_name=model_name,
+            base_model="unsloth/base",
+            dataset_name="data.jsonl",
+            dataset_path="/data.jsonl",
+            output_path="/out",
+            config={"lora_r": 16}
+        )
+
+    def test_write_resolves_to_row_id(self):
+        first = self.create_run().result(timeout=5)
+        second = self.create_run().result(timeout=5)
+        self.assertIsInstance(first, int)
+        self.assertEqual(second, first + 1)
+
+    def test_reads_see_committed_writes(self):
+        run_id = self.create_run().result(timeout=5)
+        self.db.update_training_run(run_id, status="completed", final_loss=0.5).result(timeout=5)
+
+        run = self.db.get_training_run(run_id)
+        self.assertEqual(run["status"], "completed")
+        self.assertEqual(run["final_loss"], 0.5)
+        self.assertEqual(run["config"], {"lora_r": 16})
+
+    def test_failed_write_does_not_discard_the_rest_of_its_batch(self):
+        self.db.add_model("dup", "/a", "base", 1).result(timeout=5)
+        with self.assertLogs("database", "ERROR"):
+            futures = [
+                self.db.add_model("dup", "/b", "base", 1),
+                self.db.add_model("other", "/c", "base", 2),
+            ]
+            futures[1].result(timeout=5)
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            futures[0].result(timeout=5)
+        self.assertEqual(self.db.get_model("dup")["path"], "/a")
+        self.assertEqual(self.db.get_model("other")["size_bytes"], 2)
+
+    def test_metrics_batch(self):
+        run_id = self.create_run().result(timeout=5)
+        rows = [(step, 1.0 / step, 2e-4, step / 10) for step in range(1, 101)]
+        self.db.add_training_metrics_batch(run_id, rows).result(timeout=5)
+
+        metrics = self.db.get_training_metrics(run_id)
+        self.assertEqual([m["step"] for m in metrics], list(range(1, 101)))
+
+    def test_list_queries_return_their_reader_to_the_pool(self):
+        pool_size = self.db._readers.qsize()
+        for i in range(3):
+            self.db.add_model(f"model-{i}", f"/m{i}", "base", i).result(timeout=5)
+            self.db.add_dataset(f"data-{i}", f"/d{i}", i).result(timeout=5)
+        self.create_run().result(timeout=5)
+
+        # More list calls than there are pooled readers, none of them consumed
+        for _ in range(pool_size + 1):
+            models = self.db.list_models()
+            datasets = self.db.list_datasets()
+            runs = self.db.list_training_runs_page(0, 1)
+        self.assertEqual(self.db._readers.qsize(), pool_size)
+        self.assertEqual(len(models), 3)
+        self.assertEqual(len(datasets), 3)
+        self.assertEqual(len(runs), 1)
+
+
+class MemoryDatabaseTest(unittest.TestCase):
+
+    def test_write_after_list_does_not_deadlock(self):
+        db = Database(":memory:")
+        self.addCleanup(db.close)
+        db.add_model("a", "/a", "base", 1).result(timeout=5)
+
+        models = db.list_models()
+        db.add_model("b", "/b", "base", 2).result(timeout=5)
+        self.assertEqual([m["name"] for m in models], ["a"])
+        self.assertEqual(len(db.list_models()), 2)
+
+    def test_reads_from_several_threads(self):
+        db = Database(":memory:")
+        self.addCleanup(db.close)
+        db.add_model("a", "/a", "base", 1).result(timeout=5)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(db.get_model("a")))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual([m["path"] for m in results], ["/a"] * 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dataset_validator import DatasetValidator
+
+
+class ValidateJsonlTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def write(self, name, data):
+        path = self.dir / name
+        path.write_bytes(data)
+        return path
+
+    def test_small_file_is_counted_exactly(self):
+        rows = b"".join(b'{"text": "row %d"}\n' % i for i in range(25))
+        for name, data in (("trailing.jsonl", rows), ("no_trailing.jsonl", rows.rstrip(b"\n"))):
+            result = DatasetValidator.validate_dataset(self.write(name, data))
+            self.assertTrue(result["valid"], result["errors"])
+            self.assertEqual(result["stats"]["row_count"], 25)
+            self.assertFalse(result["stats"]["sampled"])
+            self.assertEqual(len(result["preview"]), 5)
+
+    def test_large_file_count_is_estimated(self):
+        path = self.write("large.jsonl", b'{"text": "some training text"}\n' * 20000)
+
+        result = DatasetValidator.validate_dataset(path, max_scan_bytes=64 * 1024)
+
+        self.assertTrue(result["stats"]["sampled"])
+        self.assertAlmostEqual(result["stats"]["row_count"], 20000, delta=200)
+
+    def test_invalid_preview_line_is_reported(self):
+        path = self.write("bad.jsonl", b'{"text": "ok"}\nnot json\n' + b'{"text": "ok"}\n' * 20)
+
+        result = DatasetValidator.validate_dataset(path)
+
+        self.assertFalse(result["valid"])
+        self.assertTrue(any("line 2" in error for error in result["errors"]), result["errors"])
+
+    def test_sampled_stats_cover_the_whole_file(self):
+        head = b'{"text": "aaaaaaaaaa"}\n' * 1000
+        tail = b'{"text": "' + b"b" * 40 + b'", "label": 1}\n'
+        path = self.write("data.jsonl", head + tail * 1000)
+
+        with mock.patch.object(DatasetValidator, "STATS_SAMPLE_ROWS", 50):
+            result = DatasetValidator.validate_dataset(path)
+
+        stats = result["stats"]
+        self.assertTrue(result["valid"], result["errors"])
+        self.assertTrue(stats["sampled"])
+        self.assertEqual(stats["row_count"], 2000)
+        # Rows only found at the end of the file still show up in the sample
+        self.assertIn("label", stats["fields"])
+        self.assertEqual(stats["min_text_length"], 10)
+        self.assertEqual(stats["max_text_length"], 40)
+
+
+
+class ValidateCsvTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "data.csv"
+
+    def test_small_file_is_counted_exactly(self):
+        # Blank lines are not rows
+        self.path.write_text("text,label\n" + "hello world,1\n\n" * 30, encoding="utf-8")
+
+        result = DatasetValidator.validate_dataset(self.path)
+
+        stats = result["stats"]
+        self.assertTrue(result["valid"], result["errors"])
+        self.assertEqual(stats["row_count"], 30)
+        self.assertFalse(stats["sampled"])
+        self.assertEqual(stats["detected_text_field"], "text")
+        self.assertEqual(stats["max_text_length"], len("hello world"))
+
+    def test_large_file_count_is_estimated(self):
+        self.path.write_text("text,label\n" + "some training text,1\n" * 20000, encoding="utf-8")
+
+        result = DatasetValidator.validate_dataset(self.path, max_scan_bytes=64 * 1024)
+
+        self.assertTrue(result["stats"]["sampled"])
+        self.assertAlmostEqual(result["stats"]["row_count"], 20000, delta=2000)
+
+    def test_missing_text_column(self):
+        self.path.write_text("foo,bar\n1,2\n", encoding="utf-8")
+
+        result = DatasetValidator.validate_dataset(self.path)
+
+        self.assertFalse(result["valid"])
+        self.assertIn("No text field found", result["errors"][0])
+
+
+class ValidateJsonTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "data.json"
+
+    def test_small_file_is_counted_exactly(self):
+        self.path.write_text("[" + ", ".join(['{"prompt": "hi"}'] * 12) + "]", encoding="utf-8")
+
+        result = DatasetValidator.validate_dataset(self.path)
+
+        self.assertTrue(result["valid"], result["errors"])
+        self.assertEqual(result["stats"]["row_count"], 12)
+        self.assertFalse(result["stats"]["sampled"])
+
+    def test_large_file_count_is_estimated(self):
+        self.path.write_text("[" + ", ".join(['{"text": "some training text"}'] * 20000) + "]",
+                             encoding="utf-8")
+
+        result = DatasetValidator.validate_dataset(self.path, max_scan_bytes=64 * 1024)
+
+        self.assertTrue(result["stats"]["sampled"])
+        self.assertAlmostEqual(result["stats"]["row_count"], 20000, delta=2000)
+
+
+if __name__ == "__main__":
+    unittest.main()
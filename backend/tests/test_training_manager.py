@@ -0,0 +1,74 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import training_manager
+from database import Database
+from training_manager import CONTAINER_WORK_DIR, TrainingManager
+
+
+class TrainingCompletionTest(unittest.TestCase):
+    """A run whose exec exits 0 is marked completed and its output registered as a model"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.work_dir = Path(tmp.name)
+        self.db_path = self.work_dir / "test.db"
+
+        for name, value in (("WORK_DIR", self.work_dir),
+                            ("STOP_FILE", self.work_dir / training_manager.STOP_FILE_NAME),
+                            ("docker_client", mock.Mock())):
+            patcher = mock.patch.object(training_manager, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.object(training_manager, "Database",
+                                    lambda: Database(self.db_path))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_successful_run_adds_model(self):
+        output_dir = self.work_dir / "outputs" / "my-model"
+        output_dir.mkdir(parents=True)
+        (output_dir / "adapter_model.safetensors").write_bytes(b"x" * 128)
+        (output_dir / "adapter_config.json").write_bytes(b"{}")
+
+        manager = TrainingManager()
+        api = manager.docker_client.api
+        api.inspect_container.return_value = {"Mounts": [{"Destination": CONTAINER_WORK_DIR}]}
+        api.exec_create.return_value = {"Id": "exec"}
+        api.exec_inspect.return_value = {"ExitCode": 0}
+
+        config = {
+            "model_name": "unsloth/test-model",
+            "dataset_path": str(self.work_dir / "datasets" / "data.jsonl"),
+            "output_dir": str(output_dir),
+        }
+        with mock.patch.object(manager, "_find_container", return_value=("id", "unsloth")), \
+                mock.patch.object(manager, "_get_training_script", return_value="print()"), \
+                mock.patch.object(manager, "_read_output_lines", return_value=iter(())):
+            manager._training_worker(config)
+        run_id = manager.current_run_id
+        manager.db.close()
+
+        self.assertEqual(manager.training_status["message"], "Training completed successfully!")
+
+        db = Database(self.db_path)
+        self.addCleanup(db.close)
+        self.assertEqual(db.get_training_run(run_id)["status"], "completed")
+        model = db.get_model("my-model")
+        self.assertIsNotNone(model)
+        self.assertEqual(model["path"], str(output_dir))
+        self.assertEqual(model["base_model"], "unsloth/test-model")
+        self.assertEqual(model["size_bytes"], 130)
+        self.assertEqual(model["training_run_id"], run_id)
+        self.assertEqual(model["metadata"], config)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,96 @@
-import threading
+import asyncio
+import json
 import queue
+import re
+import threading
+import time
+from collections import OrderedDict, deque
 import logging
-import docker
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any
+from docker.errors import DockerException
+from docker.utils.socket import STDERR, frames_iter
 from database import Database
+from docker_manager import INFERENCE_SERVER_DOWN, INFERENCE_SHUTDOWN_SCRIPT, INFERENCE_SOCKET
+from runtime import docker_client
 
 logger = logging.getLogger(__name__)
 
+# Number of buffered metric rows written per database transaction
+METRIC_FLUSH_SIZE = 50
+
+# Buffered metrics are also written when this long has passed since the last
+# write, so the history stays current when steps are slow
+METRIC_FLUSH_INTERVAL = 2.0  # seconds
+
+# Events held per WebSocket subscriber before the oldest are dropped
+EVENT_SUBSCRIBER_QUEUE_SIZE = 1000
+
+# Log entries kept for get_latest_logs() before the oldest are dropped
+LOG_BUFFER_SIZE = 1000
+
+# Prefix of the per-step progress records printed by the training script's callback
+PROGRESS_PREFIX = "SLOTHBUCKLER_PROGRESS "
+
+# stop_training() creates this file in the shared work dir; the training callback
+# polls for it and ends training gracefully after checkpointing
+STOP_FILE_NAME = ".stop_training"
+
+# The host work dir is bind-mounted here, so checkpoints written below it go straight
+# to the host disk rather than through the container's copy-on-write layer
+WORK_DIR = Path(__file__).parent.parent / "work"
+CONTAINER_WORK_DIR = "/workspace/work"
+
+STOP_FILE = WORK_DIR / STOP_FILE_NAME
+
+# JSONL datasets larger than this are streamed into training instead of loaded whole
+STREAM_DATASET_THRESHOLD = 500 * 1024**2
+
+# Generated training scripts kept for repeat runs with the same config
+SCRIPT_CACHE_SIZE = 32
+
+# Unless logging_steps is configured, the trainer logs about this many times a run,
+# which keeps the loss chart smooth without writing a log entry every step
+TARGET_LOG_POINTS = 200
+
+# Metrics in plain trainer output, e.g. "Step 5/100" or {'loss': 0.5, 'epoch': 0.5}
+_STEP_RE = re.compile(r"step[:\s]+(\d+)[/\s]+(\d+)", re.IGNORECASE)
+_LOSS_RE = re.compile(r"['\"]loss['\"]:\s*([0-9.]+)")
+_EPOCH_RE = re.compile(r"['\"]epoch['\"]:\s*([0-9.]+)")
+
+# Stage reported by the training script -> (status message, progress)
+_STAGES = {
+    "loading_model": ("Loading model...", 0.1),
+    "adding_lora": ("Adding LoRA adapters...", 0.2),
+    "loading_dataset": ("Loading dataset...", 0.3),
+    "setting_up_trainer": ("Setting up trainer...", 0.4),
+    "training": ("Training in progress...", 0.5),
+    "saving_model": ("Saving model...", 0.9),
+}
+
+
+def _container_path(path: str) -> str:
+    """Map a host path inside the work dir to its path in the container.
+
+    Raises ValueError for paths outside the work dir, which the container can't see
+    (or, for outputs, would write into its own filesystem layer).
+    """
+    if path == CONTAINER_WORK_DIR or path.startswith(CONTAINER_WORK_DIR + "/"):
+        return path
+    try:
+        relative = Path(path).resolve().relative_to(WORK_DIR.resolve())
+    except ValueError:
+        raise ValueError(f"{path} is outside the work directory mounted at {CONTAINER_WORK_DIR}")
+    return f"{CONTAINER_WORK_DIR}/{relative.as_posix()}"
+
+
+def _deliver_event(event_queue: asyncio.Queue, event: Dict[str, Any]):
+    """Enqueue an event, dropping the oldest one if a slow subscriber's queue is full"""
+    if event_queue.full():
+        event_queue.get_nowait()
+    event_queue.put_nowait(event)
+
 class TrainingManager:
     """Manages Unsloth model training lifecycle"""
 
@@ -23,17 +105,30 @@ class TrainingManager:
             "loss": None,
             "message": "Ready to train"
         }
-        self.log_queue = queue.Queue()
+        # append and popleft are atomic on a deque, so readers drain it without a lock
+        self.log_buffer = deque(maxlen=LOG_BUFFER_SIZE)
+        self._pending_logs = queue.SimpleQueue()  # (time, message) awaiting the listener
+        self._event_subscribers = {}  # asyncio.Queue -> event loop that owns it
+        self._last_published_status = None  # status pushed to subscribers most recently
+        self._subscribers_lock = threading.Lock()
         self.stop_flag = False
+        self._in_training_stage = False  # plain output only carries metrics while training
         self.docker_client = None
+        self._cached_container = None  # (id, name) of the container the last run used
+        self._script_cache = OrderedDict()  # canonical config JSON -> script, oldest first
         self.db = Database()
         self.current_run_id = None
+        self._metric_buffer = []
+        self._last_metric_flush = time.monotonic()
         self._init_docker()
 
+        # Formatting, buffering and emitting log lines happens off the streaming thread
+        threading.Thread(target=self._log_listener_worker, daemon=True).start()
+
     def _init_docker(self):
         """Initialize Docker client"""
         try:
-            self.docker_client = docker.from_env()
+            self.docker_client = docker_client()
         except Exception as e:
             logger.error(f"Failed to initialize Docker client: {e}")
 
@@ -45,8 +140,21 @@ class TrainingManager:
                 "message": "Training already in progress"
             }
 
+        try:
+            _container_path(config['dataset_path'])
+            _container_path(config['output_dir'])
+        except ValueError as e:
+            return {
+                "success": False,
+                "message": str(e)
+            }
+
         # Reset state
         self.stop_flag = False
+        self._in_training_stage = False
+        STOP_FILE.unlink(missing_ok=True)
+        self._metric_buffer = []
+        self._last_metric_flush = time.monotonic()
         self.training_status = {
             "running": True,
             "progress": 0.0,
@@ -55,6 +163,7 @@ class TrainingManager:
             "loss": None,
             "message": "Starting training..."
         }
+        self._publish_status()
 
         # Start training thread
         self.training_thread = threading.Thread(
@@ -88,7 +197,7 @@ class TrainingManager:
                 dataset_path=config['dataset_path'],
                 output_path=config['output_dir'],
                 config=config
-            )
+            ).result()
             self._log(f"📝 Training run ID: {self.current_run_id}")
 
             # Get the Docker container
@@ -96,11 +205,9 @@ class TrainingManager:
                 raise Exception("Docker client not initialized")
 
             # Find running Unsloth container
-            containers = self.docker_client.containers.list(
-                filters={"ancestor": "unsloth/unsloth", "status": "running"}
-            )
+            container = self._find_container()
 
-            if not containers:
+            if not container:
                 self._log("❌ No running Unsloth container found!")
                 self._update_status(
                     message="No container running. Please start Docker container first.",
@@ -117,49 +224,76 @@ class TrainingManager:
                     )
                 return
 
-            container = containers[0]
-            self._log(f"✅ Found container: {container.name}")
+            container_id, container_name = container
+            self._log(f"✅ Found container: {container_name}")
+
+            mounts = self.docker_client.api.inspect_container(container_id).get("Mounts") or []
+            if not any(mount.get("Destination") == CONTAINER_WORK_DIR for mount in mounts):
+                raise Exception(
+                    f"Container {container_name} has no volume at {CONTAINER_WORK_DIR}; "
+                    "remove it and start the container again from the app"
+                )
+
+            # A model left resident by the inference server would compete for GPU memory
+            self._stop_inference_server(container_id)
 
             # Generate the training script as a string
-            training_script = self._generate_training_script(config)
+            training_script = self._get_training_script(config)
 
             # Save script to a file that container can access
-            script_path = Path(__file__).parent.parent / "work" / "train_script.py"
-            script_path.write_text(training_script)
-            self._log(f"📝 Training script saved to: {script_path}")
+            script_path = WORK_DIR / "train_script.py"
+            script_bytes = training_script.encode("utf-8")
+            # Repeat runs with the same config leave the file alone, which spares the
+            # rewrite on the container's bind mount
+            if not script_path.exists() or script_path.read_bytes() != script_bytes:
+                script_path.write_bytes(script_bytes)
+                self._log(f"📝 Training script saved to: {script_path}")
+            else:
+                self._log(f"📝 Training script unchanged: {script_path}")
 
             # Execute the training script inside the container
             self._log("🐳 Executing training in Docker container...")
             self._update_status(message="Starting training in container...", progress=0.1)
 
             # Run Python script inside container
-            exec_result = container.exec_run(
-                ["python", "/workspace/work/train_script.py"],
-                stream=True,
-                demux=True  # Separate stdout and stderr
-            )
-
-            # Stream output from container
-            for stdout_chunk, stderr_chunk in exec_result.output:
-                if self.stop_flag:
-                    self._log("⚠️ Training stopped by user")
-                    self._update_status(message="Training stopped", progress=0.0, running=False)
-                    # TODO: Kill the training process in container
-                    return
-
-                if stdout_chunk:
-                    line = stdout_chunk.decode('utf-8').strip()
-                    if line:
+            api = self.docker_client.api
+            exec_id = api.exec_create(
+                container_id, ["python", "/workspace/work/train_script.py"],
+                stdout=True, stderr=True
+            )["Id"]
+            sock = api.exec_start(exec_id, socket=True)
+
+            # Stream output from container; after a stop request the trainer checkpoints
+            # and exits on its own, so keep reading until the stream ends
+            try:
+                for is_stderr, line in self._read_output_lines(sock):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    if is_stderr:
+                        self._log(f"⚠️ {line}")
+                    elif line.startswith(PROGRESS_PREFIX):
+                        self._apply_progress(line[len(PROGRESS_PREFIX):])
+                    else:
                         self._log(line)
-                        self._parse_training_output(line)
-
-                if stderr_chunk:
-                    error = stderr_chunk.decode('utf-8').strip()
-                    if error:
-                        self._log(f"⚠️ {error}")
+                        if self._in_training_stage:
+                            self._parse_training_output(line)
+            finally:
+                sock.close()
+
+            if self.stop_flag:
+                self._log("⚠️ Training stopped by user")
+                self._update_status(message="Training stopped", progress=0.0, running=False)
+                if self.current_run_id:
+                    self.db.update_training_run(
+                        self.current_run_id,
+                        status='stopped',
+                        completed_at=datetime.now().isoformat()
+                    )
+                return
 
             # Check exit code
-            exit_code = exec_result.exit_code
+            exit_code = api.exec_inspect(exec_id)["ExitCode"]
             if exit_code == 0:
                 self._log("✅ Training completed successfully!")
                 self._update_status(
@@ -178,14 +312,17 @@ class TrainingManager:
                     )
 
                     # Save model to database
-                    output_path = config['output_dir']
-                    if Path(output_path).exists():
-                        self.db.save_model(
-                            model_name=Path(output_path).name,
-                            path=output_path,
+                    output_path = Path(config['output_dir'])
+                    if output_path.exists():
+                        self.db.add_model(
+                            name=output_path.name,
+                            path=str(output_path),
                             base_model=config['model_name'],
+                            size_bytes=sum(
+                                f.stat().st_size for f in output_path.rglob("*") if f.is_file()
+                            ),
                             training_run_id=self.current_run_id,
-                            config=config
+                            metadata=config
                         )
             else:
                 self._log(f"❌ Training failed with exit code: {exit_code}")
@@ -222,14 +359,98 @@ class TrainingManager:
                     error_message=str(e)
                 )
         finally:
+            self._flush_metrics()
             self.is_training = False
 
+    def _stop_inference_server(self, container_id):
+        """Have the container's warm inference server, if running, free its models and exit"""
+        api = self.docker_client.api
+        exec_id = api.exec_create(
+            container_id, ["python", "-c", INFERENCE_SHUTDOWN_SCRIPT, INFERENCE_SOCKET]
+        )["Id"]
+        api.exec_start(exec_id)
+        exit_code = api.exec_inspect(exec_id)["ExitCode"]
+        if exit_code == 0:
+            self._log("🧹 Stopped the inference server to free GPU memory")
+        elif exit_code != INFERENCE_SERVER_DOWN:
+            self._log(f"⚠️ Could not stop the inference server (exit code {exit_code})")
+
+    def _find_container(self):
+        """Return (id, name) of the running Unsloth container, or None.
+
+        The container used last time is checked first with a single inspect call;
+        the filtered list only runs when it is gone or no longer running.
+        """
+        api = self.docker_client.api
+        if self._cached_container:
+            try:
+                if api.inspect_container(self._cached_container[0])["State"]["Running"]:
+                    return self._cached_container
+            except DockerException:
+                pass
+            self._cached_container = None
+
+        containers = api.containers(filters={"ancestor": "unsloth/unsloth", "status": "running"})
+        if containers:
+            self._cached_container = (containers[0]["Id"], containers[0]["Names"][0].lstrip("/"))
+        return self._cached_container
+
+    @staticmethod
+    def _read_output_lines(sock):
+        """Yield (is_stderr, line) for each complete line of a multiplexed exec stream.
+
+        Frames are buffered per stream and decoded a line at a time, so lines and
+        progress records split across frames arrive whole.
+        """
+        buffers = {}
+        for stream, data in frames_iter(sock, tty=False):
+            buffer = buffers.setdefault(stream, bytearray())
+            buffer += data
+            end = max(buffer.rfind(b"\n"), buffer.rfind(b"\r"))
+            if end < 0:
+                continue
+            complete = buffer[:end + 1].decode("utf-8", errors="replace")
+            del buffer[:end + 1]
+            for line in complete.splitlines():
+                yield stream == STDERR, line
+
+        # Whatever is left after the process exits had no trailing newline
+        for stream, buffer in buffers.items():
+            if buffer:
+                yield stream == STDERR, buffer.decode("utf-8", errors="replace")
+
+    def _flush_metrics(self):
+        """Write buffered training metrics to the database in one transaction"""
+        if not self._metric_buffer or not self.current_run_id:
+            return
+
+        metrics, self._metric_buffer = self._metric_buffer, []
+        self._last_metric_flush = time.monotonic()
+        try:
+            self.db.add_training_metrics_batch(self.current_run_id, metrics)
+        except Exception as e:
+            logger.error(f"Failed to save training metrics: {e}")
+
+    def _get_training_script(self, config: Dict[str, Any]) -> str:
+        """Return the training script for a config, reusing the one generated last time"""
+        key = json.dumps(config, sort_keys=True, default=str)
+        script = self._script_cache.get(key)
+        if script is not None:
+            self._script_cache.move_to_end(key)
+            return script
+
+        script = self._generate_training_script(config)
+        self._script_cache[key] = script
+        if len(self._script_cache) > SCRIPT_CACHE_SIZE:
+            self._script_cache.popitem(last=False)
+        return script
+
     def _generate_training_script(self, config: Dict[str, Any]) -> str:
         """Generate the Python training script to run inside Docker"""
 
         # Extract config values
         model_name = config['model_name']
-        dataset_path = config['dataset_path']
+        dataset_path = _container_path(config['dataset_path'])
         max_seq_length = config.get('max_seq_length', 2048)
         learning_rate = config.get('learning_rate', 2e-4)
         num_epochs = config.get('num_epochs', 1)
@@ -237,18 +458,63 @@ class TrainingManager:
         gradient_accumulation_steps = config.get('gradient_accumulation_steps', 4)
         lora_r = config.get('lora_r', 16)
         lora_alpha = config.get('lora_alpha', 16)
-        output_dir = config['output_dir']
+        output_dir = _container_path(config['output_dir'])
         checkpoint_steps = config.get('checkpoint_steps', 100)  # Save checkpoint every N steps
+        dataset_num_proc = config.get('dataset_num_proc')  # None: decided inside the container
+        logging_steps = config.get('logging_steps')  # None: scaled to the run length
 
         # Build the script
         script = f'''
 import sys
 import os
+
+# Keep the datasets cache in the mounted work dir, so tokenized datasets survive
+# container re-creation and repeat runs on the same file skip preprocessing
+os.environ.setdefault("HF_DATASETS_CACHE", "/workspace/work/.cache/datasets")
+
+import json
 import torch
 from unsloth import FastLanguageModel
 from datasets import load_dataset
+from transformers import TrainerCallback
 from trl import SFTTrainer, SFTConfig
 
+
+STOP_FILE = "/workspace/work/{STOP_FILE_NAME}"
+
+
+def report_stage(stage):
+    print("{PROGRESS_PREFIX}" + json.dumps({{"type": "stage", "stage": stage}}), flush=True)
+
+
+class UIProgressCallback(TrainerCallback):
+    """Report every logged step to the backend and honour stop requests"""
+
+    def _check_stop(self, control):
+        if os.path.exists(STOP_FILE):
+            # Checkpoint first, so the run can resume from where it stopped
+            control.should_training_stop = True
+            control.should_save = True
+        return control
+
+    def on_step_end(self, args, state, control, **kwargs):
+        return self._check_stop(control)
+
+    def on_substep_end(self, args, state, control, **kwargs):
+        return self._check_stop(control)
+
+    def on_log(self, args, state, control, logs=None, **kwargs):
+        if logs and "loss" in logs:
+            print("{PROGRESS_PREFIX}" + json.dumps({{
+                "type": "metric",
+                "step": state.global_step,
+                "max_steps": state.max_steps,
+                "loss": logs.get("loss"),
+                "learning_rate": logs.get("learning_rate"),
+                "epoch": logs.get("epoch"),
+            }}), flush=True)
+
+
 print("=" * 60)
 print("SLOTHBUCKLER TRAINING")
 print("=" * 60)
@@ -265,6 +531,7 @@ try:
             print(f"🔄 Found checkpoint: {{checkpoint_dir}}")
 
     # Load model (from checkpoint if available)
+    report_stage("loading_model")
     if checkpoint_dir:
         print(f"📦 Resuming from checkpoint: {{checkpoint_dir}}")
         model, tokenizer = FastLanguageModel.from_pretrained(
@@ -285,6 +552,7 @@ try:
         print("✅ Model loaded successfully")
 
     # Add LoRA adapters
+    report_stage("adding_lora")
     print("🔧 Adding LoRA adapters...")
     model = FastLanguageModel.get_peft_model(
         model,
@@ -299,29 +567,67 @@ try:
     )
     print("✅ LoRA adapters added")
 
-    # Load dataset
+    # Load dataset; large JSONL files are streamed, which keeps them out of RAM
+    # but means the step count has to be worked out from the line count
+    report_stage("loading_dataset")
     print("📊 Loading dataset: {dataset_path}")
-    dataset = load_dataset('json', data_files='{dataset_path}', split='train')
-    print(f"✅ Dataset loaded: {{len(dataset)}} examples")
+    dataset_file = '{dataset_path}'
+    suffix = os.path.splitext(dataset_file)[1].lower()
+    loader = {{'.json': 'json', '.jsonl': 'json', '.parquet': 'parquet', '.csv': 'csv'}}.get(suffix)
+    if loader is None:
+        raise ValueError(f"Unsupported dataset format: {{suffix or dataset_file}}")
+
+    max_steps = -1  # let num_train_epochs decide
+    if suffix == '.jsonl' and os.path.getsize(dataset_file) > {STREAM_DATASET_THRESHOLD}:
+        with open(dataset_file, 'rb') as f:
+            num_examples = sum(block.count(b"\\n") for block in iter(lambda: f.read(1 << 20), b""))
+        dataset = load_dataset(loader, data_files=dataset_file, split='train', streaming=True)
+        steps_per_epoch = -(-num_examples // ({batch_size} * {gradient_accumulation_steps}))
+        max_steps = max(1, int(steps_per_epoch * {num_epochs}))
+        print(f"✅ Dataset streaming: ~{{num_examples}} examples, {{max_steps}} steps")
+    else:
+        dataset = load_dataset(loader, data_files=dataset_file, split='train')
+        print(f"✅ Dataset loaded: {{len(dataset)}} examples")
+
+    # Preprocessing workers: use the container's cores, but streamed datasets are
+    # tokenized on the fly and take no worker pool
+    dataset_num_proc = {dataset_num_proc!r}
+    if dataset_num_proc is None:
+        dataset_num_proc = min(os.cpu_count() or 2, 8)
+    if max_steps > 0:
+        dataset_num_proc = None
+
+    logging_steps = {logging_steps!r}
+    if logging_steps is None:
+        if max_steps > 0:
+            total_steps = max_steps
+        else:
+            steps_per_epoch = -(-len(dataset) // ({batch_size} * {gradient_accumulation_steps}))
+            total_steps = int(steps_per_epoch * {num_epochs})
+        logging_steps = max(1, total_steps // {TARGET_LOG_POINTS})
 
     # Setup trainer
+    report_stage("setting_up_trainer")
     print("⚙️ Setting up trainer...")
+    bf16 = torch.cuda.is_bf16_supported()  # fp16 and bf16 are mutually exclusive
     trainer = SFTTrainer(
         model=model,
         tokenizer=tokenizer,
         train_dataset=dataset,
         dataset_text_field="text",
         max_seq_length={max_seq_length},
-        dataset_num_proc=2,
+        dataset_num_proc=dataset_num_proc,
+        callbacks=[UIProgressCallback()],
         args=SFTConfig(
             per_device_train_batch_size={batch_size},
             gradient_accumulation_steps={gradient_accumulation_steps},
             warmup_steps=5,
             num_train_epochs={num_epochs},
+            max_steps=max_steps,
             learning_rate={learning_rate},
-            fp16=not torch.cuda.is_bf16_supported(),
-            bf16=torch.cuda.is_bf16_supported(),
-            logging_steps=1,
+            fp16=not bf16,
+            bf16=bf16,
+            logging_steps=logging_steps,
             optim="adamw_8bit",
             weight_decay=0.01,
             lr_scheduler_type="linear",
@@ -335,13 +641,19 @@ try:
     print("✅ Trainer ready")
 
     # Start training
+    report_stage("training")
     print("🎯 Starting training...")
     print("-" * 60)
     trainer.train()
     print("-" * 60)
+
+    if os.path.exists(STOP_FILE):
+        print("🛑 Training stopped, checkpoint saved")
+        sys.exit(0)
     print("✅ Training completed!")
 
     # Save model
+    report_stage("saving_model")
     print("💾 Saving model...")
     model.save_pretrained("{output_dir}")
     tokenizer.save_pretrained("{output_dir}")
@@ -360,29 +672,20 @@ except Exception as e:
         return script
 
     def _parse_training_output(self, line: str):
-        """Parse training output to update progress and extract metrics"""
-        import re
-
-        # Update progress based on keywords
-        if "Loading model" in line:
-            self._update_status(message="Loading model...", progress=0.1)
-        elif "LoRA adapters" in line:
-            self._update_status(message="Adding LoRA adapters...", progress=0.2)
-        elif "Loading dataset" in line:
-            self._update_status(message="Loading dataset...", progress=0.3)
-        elif "Setting up trainer" in line:
-            self._update_status(message="Setting up trainer...", progress=0.4)
-        elif "Starting training" in line:
-            self._update_status(message="Training in progress...", progress=0.5)
-        elif "Saving model" in line:
-            self._update_status(message="Saving model...", progress=0.9)
+        """Pick up metrics from plain trainer output that no progress record covers"""
+        # Most lines carry no metrics; single substring checks decide which, if
+        # any, of the regexes can possibly match
+        has_step = "step" in line.lower()
+        has_dict = "{" in line
+        if not has_step and not has_dict:
+            return
 
         # Parse training metrics from Hugging Face trainer output
         # Format: {'loss': 0.5, 'learning_rate': 2e-4, 'epoch': 0.5}
         # or Step X/Y: {'loss': 0.5}
         try:
             # Extract step information
-            step_match = re.search(r"step[:\s]+(\d+)[/\s]+(\d+)", line, re.IGNORECASE)
+            step_match = _STEP_RE.search(line) if has_step else None
             if step_match:
                 current_step = int(step_match.group(1))
                 total_steps = int(step_match.group(2))
@@ -394,29 +697,68 @@ except Exception as e:
                     self._update_status(progress=step_progress)
 
             # Extract loss value
-            loss_match = re.search(r"['\"]loss['\"]:\s*([0-9.]+)", line)
+            loss_match = _LOSS_RE.search(line) if has_dict else None
             if loss_match:
                 loss = float(loss_match.group(1))
+                # Metrics are recorded from the callback's progress records
                 self.training_status["loss"] = loss
 
-                # Save metric to database
-                if self.current_run_id:
-                    self.db.save_training_metric(
-                        training_run_id=self.current_run_id,
-                        step=self.training_status.get("current_step", 0),
-                        loss=loss,
-                        learning_rate=None  # Could extract this too if needed
-                    )
-
             # Extract epoch information
-            epoch_match = re.search(r"['\"]epoch['\"]:\s*([0-9.]+)", line)
+            epoch_match = _EPOCH_RE.search(line) if has_dict else None
             if epoch_match:
                 epoch = float(epoch_match.group(1))
                 # Could store this in status if needed
 
+            self._publish_status()
+
         except Exception as e:
             logger.debug(f"Error parsing training output: {e}")
 
+    def _apply_progress(self, record: str):
+        """Update status or metrics from one progress record of the training script"""
+        try:
+            progress = json.loads(record)
+        except ValueError:
+            logger.debug(f"Malformed progress record: {record}")
+            return
+
+        if progress.get("type") == "stage":
+            self._apply_stage(progress)
+        else:
+            self._apply_metric(progress)
+
+    def _apply_stage(self, progress: Dict[str, Any]):
+        """Move the status on to the stage the training script has reached"""
+        self._in_training_stage = progress.get("stage") == "training"
+        stage = _STAGES.get(progress.get("stage"))
+        if stage:
+            message, value = stage
+            self._update_status(message=message, progress=value)
+
+    def _apply_metric(self, progress: Dict[str, Any]):
+        """Update status and metrics from one logged training step"""
+        step = progress.get("step", 0)
+        max_steps = progress.get("max_steps") or 0
+        loss = progress.get("loss")
+
+        self.training_status["current_step"] = step
+        self.training_status["total_steps"] = max_steps
+        if loss is not None:
+            self.training_status["loss"] = loss
+        if max_steps > 0:
+            self.training_status["progress"] = 0.5 + (step / max_steps) * 0.4  # 50-90%
+        self._publish_status()
+        self._publish({"type": "metric", "step": step, "loss": loss})
+
+        # Buffer metric for the next batched database write
+        if self.current_run_id:
+            self._metric_buffer.append(
+                (step, loss, progress.get("learning_rate"), progress.get("epoch"))
+            )
+            if (len(self._metric_buffer) >= METRIC_FLUSH_SIZE
+                    or time.monotonic() - self._last_metric_flush >= METRIC_FLUSH_INTERVAL):
+                self._flush_metrics()
+
     def stop_training(self):
         """Stop the current training"""
         if not self.is_training:
@@ -426,7 +768,9 @@ except Exception as e:
             }
 
         self.stop_flag = True
-        self._log("🛑 Stopping training...")
+        STOP_FILE.touch()
+        self._log("🛑 Stopping training after the current step...")
+        self._update_status(message="Stopping training...")
 
         return {
             "success": True,
@@ -439,12 +783,13 @@ except Exception as e:
 
     def get_latest_logs(self):
         """Get latest log messages"""
+        # Pop entries one at a time so a line logged mid-drain is kept for next time
         logs = []
         try:
-            while True:
-                logs.append(self.log_queue.get_nowait())
-        except queue.Empty:
-            pass
+            for _ in range(len(self.log_buffer)):
+                logs.append(self.log_buffer.popleft())
+        except IndexError:
+            pass  # Another reader drained it concurrently
 
         if logs:
             return {
@@ -453,15 +798,65 @@ except Exception as e:
             }
         return None
 
+    def subscribe_events(self) -> asyncio.Queue:
+        """Get an asyncio.Queue that receives every new event; call from the event loop.
+
+        Events are dicts with a "type" of "log", "status" (sent only when the status
+        changes) or "metric".
+        """
+        event_queue = asyncio.Queue(maxsize=EVENT_SUBSCRIBER_QUEUE_SIZE)
+        with self._subscribers_lock:
+            self._event_subscribers[event_queue] = asyncio.get_running_loop()
+        return event_queue
+
+    def unsubscribe_events(self, event_queue: asyncio.Queue):
+        """Stop delivering events to a queue from subscribe_events()"""
+        with self._subscribers_lock:
+            self._event_subscribers.pop(event_queue, None)
+
+    def _publish(self, event: Dict[str, Any]):
+        """Push an event to live subscribers; their queues belong to the event loop thread"""
+        with self._subscribers_lock:
+            subscribers = list(self._event_subscribers.items())
+        for event_queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(_deliver_event, event_queue, event)
+            except RuntimeError:
+                # Event loop already closed
+                self.unsubscribe_events(event_queue)
+
+    def _publish_status(self):
+        """Publish a status event, unless nothing changed since the last one"""
+        status = dict(self.training_status)
+        if status == self._last_published_status:
+            return
+        self._last_published_status = status
+        self._publish({"type": "status", "status": status})
+
     def _log(self, message: str):
-        """Add a log message"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = {
-            "timestamp": timestamp,
-            "message": message
-        }
-        self.log_queue.put(log_entry)
-        logger.info(message)
+        """Add a log message; the listener thread formats and delivers it"""
+        self._pending_logs.put_nowait((time.time(), message))
+
+    def _log_listener_worker(self):
+        """Turn queued log messages into log entries for readers and subscribers"""
+        # Bursts of lines share a second, so the formatted stamp is reused until it changes
+        stamp_second, timestamp = None, None
+        while True:
+            created, message = self._pending_logs.get()
+            second = int(created)
+            if second != stamp_second:
+                stamp_second = second
+                timestamp = time.strftime("%H:%M:%S", time.localtime(second))
+            log_entry = {
+                "timestamp": timestamp,
+                "message": message
+            }
+            self.log_buffer.append(log_entry)
+            # With no WebSocket client connected there is nobody to build the event for;
+            # the buffer above still holds the latest lines for whoever connects next
+            if self._event_subscribers:
+                self._publish({"type": "log", **log_entry})
+            logger.info(message)
 
     def _update_status(self, message: str = None, progress: float = None, running: bool = None):
         """Update training status"""
@@ -471,3 +866,4 @@ except Exception as e:
             self.training_status["progress"] = progress
         if running is not None:
             self.training_status["running"] = running
+        self._publish_status()
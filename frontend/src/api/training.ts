@@ -11,6 +11,8 @@ export interface TrainingConfig {
   lora_r: number
   lora_alpha: number
   output_dir: string
+  dataset_num_proc?: number
+  logging_steps?: number  // omitted: about 200 log points per run
 }
 
 export async function startTraining(config: TrainingConfig) {
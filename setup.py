@@ -7,12 +7,14 @@ Installs all dependencies
 
 import subprocess
 import sys
-import os
 from pathlib import Path
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
-    os.system('chcp 65001 > nul')
+    import ctypes
+    # Same as `chcp 65001`, without spawning cmd.exe
+    ctypes.windll.kernel32.SetConsoleOutputCP(65001)
+    ctypes.windll.kernel32.SetConsoleCP(65001)
 
 def print_banner():
     try:
@@ -5,16 +5,39 @@ Slothbuckler Launcher
 Starts the backend and frontend servers and opens the browser
 """
 
+import asyncio
+import hashlib
+import json
 import subprocess
+import urllib.request
 import webbrowser
 import time
+import shutil
+import signal
+import socket
 import sys
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
 from pathlib import Path
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import uvloop  # faster subprocess pipes and socket probes; not available on Windows
+except ImportError:
+    uvloop = None
+
 # Fix Windows console encoding
 if sys.platform == 'win32':
-    os.system('chcp 65001 > nul')
+    import ctypes
+    # Same as `chcp 65001`, without spawning cmd.exe
+    ctypes.windll.kernel32.SetConsoleOutputCP(65001)
+    ctypes.windll.kernel32.SetConsoleCP(65001)
 
 def print_banner():
     try:
@@ -29,121 +52,227 @@ def print_banner():
     except UnicodeEncodeError:
         print("\n    === Slothbuckler Launcher ===\n")
 
-def kill_existing_processes():
-    """Kill any existing backend and frontend processes"""
-    print("Cleaning up existing processes...")
+BACKEND_PORT = 8000
+FRONTEND_PORTS = (5173, 5174, 5175)  # Vite moves to the next port when one is taken
+
+# Kill attempts for processes holding those ports. After each one the ports are
+# polled until free, for at most a backoff that doubles from attempt to attempt
+KILL_RETRIES = 5
+KILL_FIRST_BACKOFF = 0.05  # seconds
+KILL_MAX_BACKOFF = 2.0  # seconds
+PORT_FREE_POLL_INTERVAL = 0.05  # seconds
+
+# How long each server gets to start answering HTTP, and the backoff between checks
+SERVER_START_TIMEOUT = 60  # seconds
+PROBE_FIRST_DELAY = 0.05  # seconds
+PROBE_MAX_DELAY = 0.5  # seconds
+
+# Bytes of server output kept for error reports; pipes are always drained so a
+# chatty server never blocks on a full pipe buffer
+OUTPUT_TAIL_BYTES = 64 * 1024
+
+# Result of the last passing dependency check, kept with the app's other local state
+DEPENDENCY_CACHE_FILE = Path(__file__).parent / "work" / ".cache" / "launcher_deps.json"
+
+BACKEND_HEALTH_URL = f"http://127.0.0.1:{BACKEND_PORT}/api/health"
+FRONTEND_URL = f"http://localhost:{FRONTEND_PORTS[0]}"
+
+# Readiness probes go straight to the local servers, never through a configured proxy
+_local_opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+# A LISTENING row of `netstat -ano`: Proto, Local Address, Foreign Address, State, PID
+_NETSTAT_LISTENING_RE = re.compile(rb"^\s*TCP\s+\S+:(\d+)\s+\S+\s+LISTENING\s+(\d+)", re.MULTILINE)
+
+def _listening_pids(ports):
+    """Return {pid: port} for processes listening on any of the given TCP ports"""
+    if psutil is not None:
+        try:
+            return {
+                conn.pid: conn.laddr.port
+                for conn in psutil.net_connections(kind='tcp')
+                if conn.status == psutil.CONN_LISTEN and conn.pid
+                and conn.laddr and conn.laddr.port in ports
+            }
+        except psutil.AccessDenied:
+            pass  # macOS only lists other users' sockets for root
+
+    # One snapshot of the connection table, matched against every port at once
+    pids = {}
+    if sys.platform == 'win32':
+        result = subprocess.run(
+            ['netstat', '-ano', '-p', 'TCP'],
+            capture_output=True,
+            stdin=subprocess.DEVNULL,
+            creationflags=subprocess.CREATE_NO_WINDOW
+        )
+        for match in _NETSTAT_LISTENING_RE.finditer(result.stdout):
+            port, pid = int(match.group(1)), int(match.group(2))
+            if port in ports and pid:
+                pids[pid] = port
+    else:
+        result = subprocess.run(
+            ['lsof', '-nP', '-iTCP', '-sTCP:LISTEN', '-Fpn'],
+            capture_output=True,
+            text=True
+        )
+        pid = None
+        for field in result.stdout.splitlines():
+            if field.startswith('p'):
+                pid = int(field[1:])
+            elif field.startswith('n') and pid is not None:
+                port = int(field.rsplit(':', 1)[1])
+                if port in ports:
+                    pids[pid] = port
+    return pids
+
+def _kill_process_tree(pid):
+    """Kill a process and all of its children"""
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            for child in process.children(recursive=True):
+                child.kill()
+            process.kill()
+        except psutil.NoSuchProcess:
+            pass
+    elif sys.platform == 'win32':
+        subprocess.run(
+            ['taskkill', '/F', '/T', '/PID', str(pid)],
+            capture_output=True,
+            stdin=subprocess.DEVNULL,
+            creationflags=subprocess.CREATE_NO_WINDOW
+        )
+    else:
+        os.kill(pid, signal.SIGKILL)
 
-    # Kill processes on port 8000 (backend)
+def _port_in_use(port):
+    """Check whether anything accepts connections on a local port (IPv4 or IPv6)"""
     try:
-        if sys.platform == 'win32':
-            # Only kill LISTENING processes, ignore TIME_WAIT
-            result = subprocess.run(
-                'netstat -ano | findstr ":8000 " | findstr "LISTENING"',
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            if result.stdout:
-                pids_killed = set()
-                # Extract PID from netstat output
-                for line in result.stdout.strip().split('\n'):
-                    if line.strip():  # Skip empty lines
-                        parts = line.split()
-                        if len(parts) >= 5:
-                            pid = parts[-1]
-                            if pid != '0' and pid not in pids_killed:
-                                # Kill process tree (parent + all children)
-                                subprocess.run(f'taskkill //F //T //PID {pid}', shell=True, capture_output=True)
-                                pids_killed.add(pid)
-                                print(f"  Killed backend process (PID: {pid})")
+        with socket.create_connection(("localhost", port), timeout=0.05):
+            return True
+    except OSError:
+        return False
+
+def _kill_all(pids):
+    """Kill several process trees at once; each taskkill fallback is its own subprocess.
+
+    Returns the pids that were killed, leaving out ones that were already gone.
+    """
+    def kill(pid):
+        try:
+            _kill_process_tree(pid)
+            return True
+        except Exception:
+            return False  # Process might already be gone
+
+    pids = list(pids)
+    if not pids:
+        return []
+    with ThreadPoolExecutor(max_workers=len(pids)) as executor:
+        return [pid for pid, killed in zip(pids, executor.map(kill, pids)) if killed]
+
+def _wait_for_ports_free(ports, timeout):
+    """Poll until none of the ports accepts connections, or the timeout passes"""
+    deadline = time.monotonic() + timeout
+    while any(_port_in_use(port) for port in ports):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(PORT_FREE_POLL_INTERVAL)
+    return True
+
+def _kill_ports(ports, retries=KILL_RETRIES):
+    """Kill whatever listens on the given ports until they are free or retries run out.
+
+    Every attempt takes one snapshot of the listening sockets for all ports, kills
+    the owners, then backs off before checking again.
+    """
+    for attempt in range(retries):
+        try:
+            listening = _listening_pids(ports)
+        except Exception:
+            return  # No way to list sockets here; nothing more to do
+        if not listening:
+            return
+
+        if attempt == 0:
+            for pid in _kill_all(listening):
+                port = listening[pid]
+                name = "backend" if port == BACKEND_PORT else "frontend"
+                print(f"  Killed {name} process on port {port} (PID: {pid})")
+            print("  Waiting for processes to terminate...")
         else:
-            subprocess.run("lsof -ti:8000 | xargs kill -9", shell=True, capture_output=True)
-            print("  Killed backend process")
-    except Exception as e:
-        pass  # Process might not be running
+            for port in sorted(set(listening.values())):
+                print(f"  Port {port} still in use, force killing... (attempt {attempt}/{retries - 1})")
+            _kill_all(listening)
+        _wait_for_ports_free(ports, min(KILL_FIRST_BACKOFF * 2 ** attempt, KILL_MAX_BACKOFF))
 
-    # Kill processes on port 5173-5175 (frontend)
     try:
-        if sys.platform == 'win32':
-            pids_killed = set()
-            for port in [5173, 5174, 5175]:
-                result = subprocess.run(
-                    f'netstat -ano | findstr ":{port} " | findstr "LISTENING"',
-                    shell=True,
-                    capture_output=True,
-                    text=True
-                )
-                if result.stdout:
-                    for line in result.stdout.strip().split('\n'):
-                        if line.strip():  # Skip empty lines
-                            parts = line.split()
-                            if len(parts) >= 5:
-                                pid = parts[-1]
-                                if pid != '0' and pid not in pids_killed:
-                                    # Kill process tree (parent + all children)
-                                    subprocess.run(f'taskkill //F //T //PID {pid}', shell=True, capture_output=True)
-                                    pids_killed.add(pid)
-                                    print(f"  Killed frontend process on port {port} (PID: {pid})")
-        else:
-            subprocess.run("lsof -ti:5173 | xargs kill -9", shell=True, capture_output=True)
-            print("  Killed frontend process")
-    except Exception as e:
-        pass  # Process might not be running
+        remaining = _listening_pids(ports)
+    except Exception:
+        return
+    for port in sorted(set(remaining.values())):
+        print(f"  WARNING: Port {port} still in use after retries, continuing anyway...")
 
-    # Give processes time to clean up
-    print("  Waiting for processes to terminate...")
-    time.sleep(2)
+def kill_existing_processes():
+    """Kill any existing backend and frontend processes"""
+    print("Cleaning up existing processes...")
+    ports = (BACKEND_PORT,) + FRONTEND_PORTS
 
-    # Verify ports are free - wait up to 15 seconds with aggressive retry
-    if sys.platform == 'win32':
-        for port in [8000, 5173, 5174, 5175]:
-            for attempt in range(5):
-                result = subprocess.run(
-                    f'netstat -ano | findstr ":{port} " | findstr "LISTENING"',
-                    shell=True,
-                    capture_output=True,
-                    text=True
-                )
-                if not result.stdout:
-                    break
-
-                # If port still in use, try killing again more aggressively
-                if result.stdout and attempt < 4:
-                    print(f"  Port {port} still in use, force killing... (attempt {attempt + 1}/5)")
-                    for line in result.stdout.strip().split('\n'):
-                        if line.strip():
-                            parts = line.split()
-                            if len(parts) >= 5:
-                                pid = parts[-1]
-                                if pid != '0':
-                                    subprocess.run(f'taskkill //F //T //PID {pid}', shell=True, capture_output=True)
-                    time.sleep(2)
-                else:
-                    print(f"  WARNING: Port {port} still in use after retries, continuing anyway...")
+    # Connecting to a free local port fails at once, so a clean machine skips the
+    # connection-table scan and the wait for processes to exit
+    if not any(_port_in_use(port) for port in ports):
+        print("  No existing processes found")
+        print()
+        return
 
+    _kill_ports(ports)
     print()
 
+def _dependency_cache_key():
+    """Fingerprint of what the dependency check depends on: interpreter, PATH and manifests"""
+    root = Path(__file__).parent
+    parts = [sys.executable, os.environ.get("PATH", "")]
+    for manifest in (root / "backend" / "requirements.txt", root / "frontend" / "package.json"):
+        try:
+            parts.append(str(manifest.stat().st_mtime_ns))
+        except OSError:
+            parts.append("")
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
+
 def check_dependencies():
     """Check if required dependencies are installed"""
     print("Checking dependencies...")
 
-    # Check Python packages
+    # A passing check is remembered until the interpreter, PATH or a manifest changes
+    cache_key = _dependency_cache_key()
     try:
-        import fastapi
-        import uvicorn
-        import docker
-        print("[OK] Backend dependencies found")
-    except ImportError as e:
-        print(f"[ERROR] Missing backend dependency: {e}")
+        cached = json.loads(DEPENDENCY_CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        cached = {}
+    if cached.get("key") == cache_key:
+        print(f"[OK] Dependencies unchanged since last launch (Node.js {cached.get('node')})")
+        return True
+
+    # Check Python packages; find_spec only locates them, the backend imports them itself
+    missing = [name for name in ("fastapi", "uvicorn", "docker") if find_spec(name) is None]
+    if missing:
+        print(f"[ERROR] Missing backend dependency: {', '.join(missing)}")
         print("Install with: cd backend && pip install -r requirements.txt")
         return False
+    print("[OK] Backend dependencies found")
+
+    # The backend only talks to the Docker daemon, so a missing CLI is worth a
+    # warning (Docker is probably not installed) but not a reason to stop
+    if shutil.which("docker") is None and not os.environ.get("DOCKER_HOST"):
+        print("[WARNING] Docker not found on PATH; training and export need Docker running")
 
     # Check Node.js and npm
     try:
         node_cmd = "node" if sys.platform != "win32" else "node.exe"
-        result = subprocess.run([node_cmd, "--version"], capture_output=True, text=True, shell=True if sys.platform == "win32" else False)
+        result = subprocess.run([node_cmd, "--version"], capture_output=True, text=True, stdin=subprocess.DEVNULL)
         if result.returncode == 0:
-            print(f"[OK] Node.js found: {result.stdout.strip()}")
+            node_version = result.stdout.strip()
+            print(f"[OK] Node.js found: {node_version}")
         else:
             raise Exception("Node.js not found")
     except Exception as e:
@@ -151,150 +280,261 @@ def check_dependencies():
         print("Install Node.js from https://nodejs.org/")
         return False
 
+    try:
+        DEPENDENCY_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        DEPENDENCY_CACHE_FILE.write_text(json.dumps({"key": cache_key, "node": node_version}))
+    except OSError:
+        pass  # Only costs a re-check next launch
+
     return True
 
-def start_backend():
+async def _spawn(args, cwd):
+    """Start a subprocess with piped output, without going through a shell"""
+    # On POSIX give it its own process group, so _terminate_tree reaches its children;
+    # on Windows taskkill /T walks the tree instead
+    session = {} if sys.platform == "win32" else {"start_new_session": True}
+    return await asyncio.create_subprocess_exec(
+        *args,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        **session
+    )
+
+async def _terminate_tree(process):
+    """Stop a spawned process together with everything it started.
+
+    terminate() alone would leave uvicorn's and Vite's worker processes running,
+    holding the ports and the output pipes.
+    """
+    if process.returncode is not None:
+        return
+    try:
+        if sys.platform == "win32":
+            await asyncio.to_thread(_kill_process_tree, process.pid)
+        else:
+            os.killpg(process.pid, signal.SIGTERM)
+    except (ProcessLookupError, OSError):
+        pass  # Already exited
+
+_output_drains = set()  # keeps the drain tasks referenced while they run
+
+async def _drain(stream, output):
+    """Read a pipe to EOF, keeping only the latest output.
+
+    Reads fixed-size chunks rather than lines, so one enormous line can neither
+    stall the drain nor grow the buffer past OUTPUT_TAIL_BYTES.
+    """
+    while True:
+        chunk = await stream.read(OUTPUT_TAIL_BYTES)
+        if not chunk:
+            break
+        output += chunk
+        del output[:-OUTPUT_TAIL_BYTES]
+
+async def _spawn_server(args, cwd):
+    """Start a long-running server whose output is drained in the background.
+
+    Returns (process, output, drained): output is a bytearray with the tail of stdout
+    and stderr, and drained completes once both pipes hit EOF.
+    """
+    process = await _spawn(args, cwd)
+    output = bytearray()
+    drained = asyncio.gather(_drain(process.stdout, output), _drain(process.stderr, output))
+    _output_drains.add(drained)
+    drained.add_done_callback(_output_drains.discard)
+    return process, output, drained
+
+async def _report_failure(process, output, drained):
+    """Stop a server that didn't come up and print the end of its output"""
+    await _terminate_tree(process)
+    await process.wait()
+    await drained
+    if output:
+        print("Error:\n" + output.decode(errors="replace").strip())
+
+def _http_ok(url):
+    """Check whether a URL answers with 200"""
+    try:
+        with _local_opener.open(url, timeout=1) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+async def wait_for_http(url, process, timeout):
+    """Wait until a server answers HTTP requests, backing off between attempts.
+
+    Returns False if the process exits or the timeout passes first.
+    """
+    deadline = time.monotonic() + timeout
+    delay = PROBE_FIRST_DELAY
+    while time.monotonic() < deadline and process.returncode is None:
+        if await asyncio.to_thread(_http_ok, url):
+            return True
+        await asyncio.sleep(delay)
+        delay = min(delay * 1.5, PROBE_MAX_DELAY)
+    return False
+
+async def start_backend():
     """Start the FastAPI backend server"""
     print("\nStarting backend server...")
     backend_dir = Path(__file__).parent / "backend"
 
-    backend_process = subprocess.Popen(
-        [sys.executable, "main.py"],
-        cwd=backend_dir,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
-    )
+    backend_process, output, drained = await _spawn_server([sys.executable, "main.py"], backend_dir)
 
     # Wait for backend to be ready
     print("Waiting for backend to start...")
-    time.sleep(4)
-
-    if backend_process.poll() is None:
-        print("[OK] Backend server started on http://localhost:8000")
+    try:
+        ready = await wait_for_http(BACKEND_HEALTH_URL, backend_process, SERVER_START_TIMEOUT)
+    except asyncio.CancelledError:
+        # Stopped during startup, before run_servers has the process to clean up
+        await stop_process(backend_process, "Backend")
+        raise
+    if ready:
+        print(f"[OK] Backend server started on http://localhost:{BACKEND_PORT}")
         return backend_process
     else:
         print("[ERROR] Failed to start backend server")
-        stdout, stderr = backend_process.communicate()
-        print(f"Error: {stderr}")
+        await _report_failure(backend_process, output, drained)
         return None
 
-def start_frontend():
+def _frontend_needs_install(frontend_dir):
+    """Check whether node_modules is missing or older than the lock file.
+
+    npm writes node_modules/.package-lock.json on every install, so its mtime says
+    when node_modules was last brought in line with package-lock.json.
+    """
+    installed = frontend_dir / "node_modules" / ".package-lock.json"
+    try:
+        installed_mtime = installed.stat().st_mtime
+    except OSError:
+        return True
+    for manifest in (frontend_dir / "package-lock.json", frontend_dir / "package.json"):
+        try:
+            if manifest.stat().st_mtime > installed_mtime:
+                return True
+        except OSError:
+            pass
+    return False
+
+async def start_frontend():
     """Start the Vite dev server"""
     print("\nStarting frontend server...")
     frontend_dir = Path(__file__).parent / "frontend"
 
-    # Determine npm command based on OS
-    npm_cmd = "npm.cmd" if sys.platform == "win32" else "npm"
+    # Resolved to a full path (npm.cmd on Windows), which runs without a shell
+    npm_cmd = shutil.which("npm") or "npm"
 
-    # Check if node_modules exists
-    if not (frontend_dir / "node_modules").exists():
-        print("Installing frontend dependencies (first time only)...")
-        install_process = subprocess.run(
-            [npm_cmd, "install"],
-            cwd=frontend_dir,
-            capture_output=True,
-            text=True,
-            shell=sys.platform == "win32"
-        )
+    if _frontend_needs_install(frontend_dir):
+        print("Installing frontend dependencies...")
+        install_process = await _spawn([npm_cmd, "install"], frontend_dir)
+        _, stderr = await install_process.communicate()
         if install_process.returncode != 0:
-            print(f"[ERROR] Failed to install dependencies: {install_process.stderr}")
+            print(f"[ERROR] Failed to install dependencies: {stderr.decode(errors='replace')}")
             return None
         print("[OK] Dependencies installed")
 
-    frontend_process = subprocess.Popen(
-        [npm_cmd, "run", "dev"],
-        cwd=frontend_dir,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        shell=sys.platform == "win32"
-    )
+    frontend_process, output, drained = await _spawn_server([npm_cmd, "run", "dev"], frontend_dir)
 
     # Wait for frontend to be ready
     print("Waiting for frontend to start...")
-    time.sleep(5)
-
-    if frontend_process.poll() is None:
-        print("[OK] Frontend server started on http://localhost:5173")
+    try:
+        ready = await wait_for_http(FRONTEND_URL, frontend_process, SERVER_START_TIMEOUT)
+    except asyncio.CancelledError:
+        # Stopped during startup, before run_servers has the process to clean up
+        await stop_process(frontend_process, "Frontend")
+        raise
+    if ready:
+        print(f"[OK] Frontend server started on {FRONTEND_URL}")
+        # Open right away rather than waiting on the backend, which starts alongside
+        open_browser()
         return frontend_process
     else:
         print("[ERROR] Failed to start frontend server")
+        await _report_failure(frontend_process, output, drained)
         return None
 
 def open_browser():
     """Open the browser to the frontend URL"""
     print("\nOpening browser...")
-    time.sleep(2)
-    webbrowser.open("http://localhost:5173")
-
-def main():
-    print_banner()
-
-    # Kill existing processes first
-    kill_existing_processes()
+    webbrowser.open(FRONTEND_URL)
 
-    # Check dependencies
-    if not check_dependencies():
-        print("\n[ERROR] Dependency check failed. Please install missing dependencies.")
-        input("\nPress Enter to exit...")
-        return
+async def stop_process(process, name):
+    """Terminate a server process and its children, and wait for it to exit"""
+    if process.returncode is None:
+        await _terminate_tree(process)
+        await process.wait()
+    print(f"[OK] {name} stopped")
 
+async def run_servers():
+    """Start both servers side by side and keep them running until one exits or Ctrl+C"""
     backend_process = None
     frontend_process = None
 
     try:
-        # Start backend
-        backend_process = start_backend()
-        if not backend_process:
-            return
-
-        # Start frontend
-        frontend_process = start_frontend()
-        if not frontend_process:
+        # Let both finish starting even if one raises (e.g. npm missing), so the
+        # finally block below can stop whichever server did come up
+        results = await asyncio.gather(start_backend(), start_frontend(), return_exceptions=True)
+        backend_process, frontend_process = (
+            None if isinstance(result, BaseException) else result for result in results
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        if not backend_process or not frontend_process:
             return
 
-        # Open browser
-        open_browser()
-
         print("\n" + "="*50)
         print("Slothbuckler is running!")
         print("="*50)
         print("\nURLs:")
-        print("   Frontend: http://localhost:5173")
-        print("   Backend:  http://localhost:8000")
-        print("   API Docs: http://localhost:8000/docs")
+        print(f"   Frontend: {FRONTEND_URL}")
+        print(f"   Backend:  http://localhost:{BACKEND_PORT}")
+        print(f"   API Docs: http://localhost:{BACKEND_PORT}/docs")
         print("\nPress Ctrl+C to stop all servers")
         print("="*50 + "\n")
 
-        # Keep running until user stops
-        while True:
-            time.sleep(1)
-
-            # Check if processes are still running
-            if backend_process.poll() is not None:
-                print("[WARNING] Backend server stopped unexpectedly")
-                break
-            if frontend_process.poll() is not None:
-                print("[WARNING] Frontend server stopped unexpectedly")
-                break
-
-    except KeyboardInterrupt:
+        # Keep running until user stops or a server exits
+        exits = {
+            asyncio.ensure_future(backend_process.wait()): "Backend",
+            asyncio.ensure_future(frontend_process.wait()): "Frontend",
+        }
+        done, pending = await asyncio.wait(exits, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            print(f"[WARNING] {exits[task]} server stopped unexpectedly")
+
+    except asyncio.CancelledError:
+        # asyncio.run cancels this task on Ctrl+C
         print("\n\nStopping servers...")
+        raise
 
     finally:
         # Cleanup
         if backend_process:
-            backend_process.terminate()
-            backend_process.wait()
-            print("[OK] Backend stopped")
-
+            await stop_process(backend_process, "Backend")
         if frontend_process:
-            frontend_process.terminate()
-            frontend_process.wait()
-            print("[OK] Frontend stopped")
+            await stop_process(frontend_process, "Frontend")
+
+def main():
+    print_banner()
+
+    # Kill existing processes first
+    kill_existing_processes()
+
+    # Check dependencies
+    if not check_dependencies():
+        print("\n[ERROR] Dependency check failed. Please install missing dependencies.")
+        input("\nPress Enter to exit...")
+        return
+
+    try:
+        (uvloop.run if uvloop is not None else asyncio.run)(run_servers())
+    except KeyboardInterrupt:
+        pass
 
-        print("\nGoodbye!")
+    print("\nGoodbye!")
 
 if __name__ == "__main__":
     main()
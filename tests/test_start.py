@@ -0,0 +1,106 @@
+import shutil
+import socket
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import start
+
+
+def _completed(stdout):
+    return subprocess.CompletedProcess(args=[], returncode=0, stdout=stdout, stderr=b"")
+
+
+class ListeningPidsTest(unittest.TestCase):
+    """The netstat and lsof fallbacks used when psutil isn't installed"""
+
+    def setUp(self):
+        patcher = mock.patch.object(start, "psutil", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_netstat_snapshot(self):
+        output = (
+            b"Active Connections\r\n\r\n"
+            b"  Proto  Local Address          Foreign Address        State           PID\r\n"
+            b"  TCP    0.0.0.0:8000           0.0.0.0:0              LISTENING       4242\r\n"
+            b"  TCP    [::1]:5174             [::]:0                 LISTENING       5151\r\n"
+            b"  TCP    0.0.0.0:9999           0.0.0.0:0              LISTENING       6000\r\n"
+            b"  TCP    127.0.0.1:8000         127.0.0.1:50000        ESTABLISHED     7000\r\n"
+        )
+        with mock.patch.object(start.sys, "platform", "win32"), \
+                mock.patch.object(start.subprocess, "CREATE_NO_WINDOW", 0, create=True), \
+                mock.patch.object(start.subprocess, "run", return_value=_completed(output)) as run:
+            pids = start._listening_pids((8000, 5173, 5174))
+
+        self.assertEqual(pids, {4242: 8000, 5151: 5174})
+        run.assert_called_once()
+
+    def test_lsof_fields(self):
+        output = "p100\nn*:8000\np200\nn127.0.0.1:5173\nn[::1]:5173\np300\nn*:22\n"
+        with mock.patch.object(start.sys, "platform", "linux"), \
+                mock.patch.object(start.subprocess, "run", return_value=_completed(output)):
+            pids = start._listening_pids((8000, 5173))
+
+        self.assertEqual(pids, {100: 8000, 200: 5173})
+
+
+class KillPortsTest(unittest.TestCase):
+
+    def test_free_ports_are_left_alone(self):
+        with mock.patch.object(start, "_listening_pids", return_value={}), \
+                mock.patch.object(start, "_kill_all") as kill_all:
+            start._kill_ports((8000,))
+        kill_all.assert_not_called()
+
+    def test_retries_until_ports_are_free(self):
+        snapshots = [{10: 8000, 11: 5173}, {11: 5173}, {}]
+        with mock.patch.object(start, "_listening_pids", side_effect=snapshots), \
+                mock.patch.object(start, "_kill_all", side_effect=lambda pids: list(pids)) as kill_all, \
+                mock.patch.object(start, "_wait_for_ports_free") as wait, \
+                mock.patch("builtins.print"):
+            start._kill_ports((8000, 5173))
+
+        self.assertEqual([list(call.args[0]) for call in kill_all.call_args_list], [[10, 11], [11]])
+        # The wait after each attempt backs off
+        timeouts = [call.args[1] for call in wait.call_args_list]
+        self.assertEqual(timeouts, sorted(timeouts))
+        self.assertLess(timeouts[0], timeouts[1])
+
+    def test_listing_failure_stops_quietly(self):
+        with mock.patch.object(start, "_listening_pids", side_effect=FileNotFoundError), \
+                mock.patch.object(start, "_kill_all") as kill_all:
+            start._kill_ports((8000,))
+        kill_all.assert_not_called()
+
+    @unittest.skipUnless(start.psutil or (sys.platform != "win32" and shutil.which("lsof")),
+                         "needs psutil or lsof")
+    def test_kills_a_real_listener(self):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+
+        server = subprocess.Popen([
+            sys.executable, "-c",
+            "import socket, sys, time\n"
+            f"s = socket.create_server(('127.0.0.1', {port}))\n"
+            "print('ready', flush=True)\n"
+            "time.sleep(60)\n"
+        ], stdout=subprocess.PIPE)
+        self.addCleanup(server.kill)
+        self.addCleanup(server.stdout.close)
+        self.assertEqual(server.stdout.readline().strip(), b"ready")
+
+        with mock.patch("builtins.print"):
+            start._kill_ports((port,))
+
+        self.assertIsNotNone(server.wait(timeout=5))
+        self.assertFalse(start._port_in_use(port))
+
+
+if __name__ == "__main__":
+    unittest.main()